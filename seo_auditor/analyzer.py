@@ -1,5 +1,7 @@
 import time
 import re
+import copy
+import heapq
 import asyncio
 import aiohttp
 from urllib.parse import urljoin, urlparse
@@ -7,37 +9,113 @@ from bs4 import BeautifulSoup
 import textstat
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from .config import TIMEOUT, MAX_BROKEN_LINK_CHECKS
-from .utils import get_session, get_schema_types
+from .config import TIMEOUT, MAX_BROKEN_LINK_CHECKS, MAX_HTML_BYTES
+from .utils import get_shared_session, get_schema_types
+from .cache import get_page_entry, store_page_entry
 
-session = get_session()
+# Connection pool and in-flight cap for the async fetch helpers
+ASYNC_FETCH_LIMIT = 64
+ASYNC_FETCH_LIMIT_PER_HOST = 8
+ASYNC_FETCH_CONCURRENCY = 20
 
-async def fetch_page_async(url, session_obj=None):
-    """Async fetch a page using aiohttp for true concurrent loading."""
+async def _fetch_with(session_async, url):
     try:
-        timeout = aiohttp.ClientTimeout(total=TIMEOUT)
-        async with aiohttp.ClientSession(timeout=timeout) as session_async:
-            async with session_async.get(url, ssl=False, allow_redirects=True) as resp:
-                return url, resp.status, await resp.read(), resp.headers
+        async with session_async.get(url, ssl=False, allow_redirects=True) as resp:
+            return url, resp.status, await resp.read(), resp.headers
     except asyncio.TimeoutError:
         return url, 0, None, {}
     except Exception as e:
         return url, 0, None, {}
 
-async def fetch_pages_async(urls):
-    """Fetch multiple pages concurrently using async."""
-    tasks = [fetch_page_async(url) for url in urls]
-    return await asyncio.gather(*tasks)
+async def fetch_page_async(url, session_obj=None):
+    """Async fetch a page using aiohttp; pass session_obj to reuse an open ClientSession."""
+    if session_obj is not None:
+        return await _fetch_with(session_obj, url)
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    async with aiohttp.ClientSession(timeout=timeout) as session_async:
+        return await _fetch_with(session_async, url)
 
-def check_link_status(url):
+async def fetch_pages_async(urls):
+    """
+    Fetch multiple pages concurrently over one pooled ClientSession.
+    Returns (url, status, body, headers) per URL in input order; failures have status 0.
+    """
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=ASYNC_FETCH_LIMIT, limit_per_host=ASYNC_FETCH_LIMIT_PER_HOST)
+    sem = asyncio.BoundedSemaphore(ASYNC_FETCH_CONCURRENCY)
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session_async:
+        async def bounded(url):
+            async with sem:
+                return await _fetch_with(session_async, url)
+        return await asyncio.gather(*(bounded(url) for url in urls))
+
+# HEAD checks for every page in an audit run here, instead of a fresh 20-thread pool per page
+LINK_CHECK_WORKERS = 32
+_LINK_CHECKER = ThreadPoolExecutor(max_workers=LINK_CHECK_WORKERS, thread_name_prefix="link-check")
+
+def check_link_status(url, session=None):
     """Checks the status of a single link."""
+    session = session or get_shared_session()
     try:
         resp = session.head(url, timeout=5)
         return resp.status_code >= 400
     except:
         return True
 
-def analyze_page(url, domain_netloc):
+def _count_broken_links(links, domain_netloc, session):
+    """HEAD-checks links on the shared pool; returns (internal_broken, external_broken)."""
+    internal_broken_count = 0
+    external_broken_count = 0
+
+    # Link checks from every page in the audit share one bounded pool
+    future_to_url = {_LINK_CHECKER.submit(check_link_status, link, session): link for link in links}
+    for future in as_completed(future_to_url):
+        url_checked = future_to_url[future]
+        is_broken = future.result()
+
+        if is_broken:
+            # Determine if internal or external
+            p_href = urlparse(url_checked)
+            if p_href.netloc == domain_netloc:
+                internal_broken_count += 1
+            else:
+                external_broken_count += 1
+
+    return internal_broken_count, external_broken_count
+
+def _broken_links_issue(count):
+    return f"{count} Internal Broken Links"
+
+def _replay_cached(cached, domain_netloc, session):
+    """
+    Rebuilds a revalidated (304) page from its cached row. The page is unchanged, but the
+    links it points to may not be, so they are checked again. load_time_s is the cached
+    measurement, which cached_result flags.
+    """
+    result = copy.deepcopy(cached["result_row"])
+    result["cached_result"] = True
+    links = cached.get("links")
+    if links is None:
+        # Stored before links were kept; nothing to re-check
+        return result
+
+    stale_issue = _broken_links_issue(result["internal_broken_links"])
+    issues = [issue for issue in result["issues_found"] if issue != stale_issue]
+    result["internal_broken_links"], result["external_broken_links"] = _count_broken_links(links, domain_netloc, session)
+    if result["internal_broken_links"] > 0:
+        issues.append(_broken_links_issue(result["internal_broken_links"]))
+    result["issues_found"] = issues
+    return result
+
+def _status_type(status_code):
+    if 200 <= status_code < 300: return "Success"
+    elif 300 <= status_code < 400: return "Redirect"
+    elif 400 <= status_code < 500: return "Client Error"
+    else: return "Server Error"
+
+def analyze_page(url, domain_netloc, session=None):
+    session = session or get_shared_session()
     result = {
         "url": url,
         "status_code": 0,
@@ -62,6 +140,7 @@ def analyze_page(url, domain_netloc):
         "internal_broken_links": 0,
         "external_broken_links": 0,
         "load_time_s": 0.0,
+        "cached_result": False,
 
         # --- FLAGS ---
         "multiple_title_tags": False,
@@ -71,23 +150,61 @@ def analyze_page(url, domain_netloc):
         "issues_found": []
     }
 
+    # Revalidate against the last audit; an unchanged page answers 304 with no body
+    cached = get_page_entry(url)
+    conditional_headers = {}
+    if cached:
+        if cached.get("etag"):
+            conditional_headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            conditional_headers["If-Modified-Since"] = cached["last_modified"]
+
+    # Cheap HEAD first so PDFs, images and other binaries in the sitemap are never downloaded.
+    # Pages already in the cache are known to be HTML, so they skip straight to the GET.
+    if not cached:
+        try:
+            start = time.time()
+            h = session.head(url, timeout=TIMEOUT, allow_redirects=True)
+            content_type = h.headers.get("Content-Type", "")
+            if h.status_code < 400 and content_type and "text/html" not in content_type:
+                result["load_time_s"] = round(time.time() - start, 2)
+                result["status_code"] = h.status_code
+                result["status_type"] = _status_type(h.status_code)
+                result["https_ok"] = h.url.startswith("https://")
+                result["page_size_kb"] = round(int(h.headers.get("Content-Length") or 0) / 1024, 2)
+                result["issues_found"].append(f"Non-HTML ({content_type.split(';')[0].strip()})")
+                return result
+        except Exception:
+            # Some servers reject HEAD; the GET below decides
+            pass
+
     try:
         start = time.time()
-        r = session.get(url, timeout=TIMEOUT)
+        with session.get(url, timeout=TIMEOUT, headers=conditional_headers, stream=True) as r:
+            if r.status_code == 304 and cached:
+                return _replay_cached(cached, domain_netloc, session)
+
+            # Read at most MAX_HTML_BYTES (+1 to detect truncation)
+            body = r.raw.read(MAX_HTML_BYTES + 1, decode_content=True)
         result["load_time_s"] = round(time.time() - start, 2)
         result["status_code"] = r.status_code
 
         # 1. Page Size (KB)
-        result["page_size_kb"] = round(len(r.content) / 1024, 2)
+        truncated = len(body) > MAX_HTML_BYTES
+        body = body[:MAX_HTML_BYTES]
+        # Content-Length still gives the full size when the body was cut off at MAX_HTML_BYTES.
+        # A compressed response's Content-Length is its wire size, so those keep the bytes read.
+        size_bytes = len(body)
+        content_length = r.headers.get("Content-Length")
+        if isinstance(content_length, str) and content_length.isdigit() and not r.headers.get("Content-Encoding"):
+            size_bytes = int(content_length)
+        result["page_size_kb"] = round(size_bytes / 1024, 2)
 
         # 2. HTTPS Check
         result["https_ok"] = r.url.startswith("https://")
 
         # Status Type
-        if 200 <= r.status_code < 300: result["status_type"] = "Success"
-        elif 300 <= r.status_code < 400: result["status_type"] = "Redirect"
-        elif 400 <= r.status_code < 500: result["status_type"] = "Client Error"
-        else: result["status_type"] = "Server Error"
+        result["status_type"] = _status_type(r.status_code)
 
     except Exception as e:
         result["issues_found"].append(f"Conn Error: {str(e)}")
@@ -96,7 +213,10 @@ def analyze_page(url, domain_netloc):
     if "text/html" not in r.headers.get("Content-Type", "") or r.status_code >= 400:
         return result
 
-    soup = BeautifulSoup(r.text, "lxml")
+    # Without an explicit charset header, let the parser sniff <meta charset> instead of
+    # falling back to requests' ISO-8859-1 default
+    encoding = r.encoding if "charset" in r.headers.get("Content-Type", "").lower() else None
+    soup = BeautifulSoup(body, "lxml", from_encoding=encoding)
 
     # 3. Schema Types
     result["schema_types"] = get_schema_types(soup)
@@ -152,37 +272,19 @@ def analyze_page(url, domain_netloc):
             result["external_links"] += 1
             external_urls_to_check.add(full_href)
 
-    # Check a subset of links for 404s
-    internal_to_test = list(internal_urls_to_check)[:MAX_BROKEN_LINK_CHECKS]
-    external_to_test = list(external_urls_to_check)[:MAX_BROKEN_LINK_CHECKS]
+    # Check a subset of links for 404s. nsmallest picks the same K links on every run
+    # (set order is arbitrary) in O(N log K) without sorting the whole set.
+    internal_to_test = heapq.nsmallest(MAX_BROKEN_LINK_CHECKS, internal_urls_to_check)
+    external_to_test = heapq.nsmallest(MAX_BROKEN_LINK_CHECKS, external_urls_to_check)
 
     all_links_to_test = internal_to_test + external_to_test
 
-    internal_broken_count = 0
-    external_broken_count = 0
-
-    # Concurrent broken link checking with increased workers
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        future_to_url = {executor.submit(check_link_status, link): link for link in all_links_to_test}
-        for future in as_completed(future_to_url):
-            url_checked = future_to_url[future]
-            is_broken = future.result()
-
-            if is_broken:
-                # Determine if internal or external
-                p_href = urlparse(url_checked)
-                if p_href.netloc == domain_netloc:
-                    internal_broken_count += 1
-                else:
-                    external_broken_count += 1
-
-    result["internal_broken_links"] = internal_broken_count
-    result["external_broken_links"] = external_broken_count
+    result["internal_broken_links"], result["external_broken_links"] = _count_broken_links(all_links_to_test, domain_netloc, session)
 
     # --- ISSUES LIST ---
     issues = result["issues_found"]
     if not result["https_ok"]: issues.append("Not HTTPS")
-    if result["page_size_kb"] > 2000: issues.append("Large Page (>2MB)")
+    if truncated or result["page_size_kb"] > MAX_HTML_BYTES / 1024: issues.append(f"Large Page (>{MAX_HTML_BYTES / 1024 / 1024:g}MB)")
     if not result["schema_types"]: issues.append("No Schema")
     if result["title_len"] == 0: issues.append("Missing Title")
     elif result["title_len"] > 60: issues.append("Title > 60 chars")
@@ -192,6 +294,9 @@ def analyze_page(url, domain_netloc):
     if result["missing_alt_count"] > 0: issues.append(f"{result['missing_alt_count']} Images missing Alt")
 
     if result["internal_broken_links"] > 0:
-        issues.append(f"{result['internal_broken_links']} Internal Broken Links")
+        issues.append(_broken_links_issue(result["internal_broken_links"]))
+
+    if r.status_code == 200:
+        store_page_entry(url, r.headers.get("ETag"), r.headers.get("Last-Modified"), result, all_links_to_test)
 
     return result
@@ -0,0 +1,189 @@
+import copy
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from urllib.parse import urlparse
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+from .config import AUDIT_CACHE_DIR, AUDIT_CACHE_TTL, AUDIT_CACHE_SIZE_LIMIT
+from .crawler import check_robots_txt, iter_sitemap_urls
+from .utils import iter_unique_urls
+
+# Sitemap and robots.txt lookups are reused for this long after they were fetched
+CRAWL_CACHE_TTL = 300
+
+def _ttl_cache(maxsize, ttl, cache_empty=True, cache_none=True):
+    """
+    Like functools.lru_cache, but each entry expires ttl seconds after it was stored.
+    With cache_empty=False, falsy results (e.g. a failed fetch) are not kept;
+    with cache_none=False, only None is skipped.
+    """
+    def decorator(func):
+        entries = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            with lock:
+                hit = entries.get(args)
+                if hit is not None and time.monotonic() - hit[0] < ttl:
+                    entries.move_to_end(args)
+                    return hit[1]
+            value = func(*args)
+            if (value or cache_empty) and (value is not None or cache_none):
+                with lock:
+                    entries[args] = (time.monotonic(), value)
+                    entries.move_to_end(args)
+                    while len(entries) > maxsize:
+                        entries.popitem(last=False)
+            return value
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        def cache_peek(*args):
+            """Returns the stored value for args without calling func, or None if missing or expired."""
+            with lock:
+                hit = entries.get(args)
+                if hit is not None and time.monotonic() - hit[0] < ttl:
+                    return hit[1]
+            return None
+
+        def cache_invalidate(*prefix):
+            """Drops every entry whose arguments start with prefix."""
+            with lock:
+                for key in [key for key in entries if key[:len(prefix)] == prefix]:
+                    del entries[key]
+
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_peek = cache_peek
+        wrapper.cache_invalidate = cache_invalidate
+        return wrapper
+    return decorator
+
+def _site_root(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+# An empty result is usually a transient fetch failure, so it is retried on the next call
+@_ttl_cache(maxsize=256, ttl=CRAWL_CACHE_TTL, cache_empty=False)
+def _fetch_and_parse(site_root, limit):
+    """Fetches /sitemap.xml, falling back to /sitemap_index.xml."""
+    # Parsing is streamed, so stopping at the limit also skips unread child sitemaps.
+    # Variants of one page are dropped before the limit, so it counts distinct pages.
+    urls = tuple(islice(iter_unique_urls(iter_sitemap_urls(f"{site_root}/sitemap.xml")), limit))
+    if not urls:
+        urls = tuple(islice(iter_unique_urls(iter_sitemap_urls(f"{site_root}/sitemap_index.xml")), limit))
+    return urls
+
+def get_sitemap(homepage_url, limit=None, fresh=False) -> tuple:
+    """
+    Returns the distinct URLs listed in the site's sitemap (see canonical_url_key), in sitemap
+    order, stopping after limit URLs.
+    Results are shared between the Audit and Sitemap tabs for CRAWL_CACHE_TTL seconds;
+    fresh=True discards the site's cached entries and re-fetches.
+    """
+    site_root = _site_root(homepage_url)
+    if fresh:
+        _fetch_and_parse.cache_invalidate(site_root)
+    # A full sitemap fetched by the Sitemap tab also answers the Audit tab's limited lookups
+    full = _fetch_and_parse.cache_peek(site_root, None)
+    if full is not None:
+        return full[:limit]
+    return _fetch_and_parse(site_root, limit)
+
+@_ttl_cache(maxsize=64, ttl=CRAWL_CACHE_TTL)
+def _robots_cached(site_root):
+    return check_robots_txt(site_root)
+
+def get_robots(url, fresh=False) -> bool:
+    """Returns whether the site serves a robots.txt, cached like the sitemap."""
+    site_root = _site_root(url)
+    if fresh:
+        _robots_cached.cache_invalidate(site_root)
+    return _robots_cached(site_root)
+
+# --- Conditional-GET page cache (persists across restarts) ---
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+def _get_page_cache():
+    global _page_cache
+    if diskcache is None:
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = diskcache.Cache(AUDIT_CACHE_DIR, size_limit=AUDIT_CACHE_SIZE_LIMIT)
+    return _page_cache
+
+def get_page_entry(url):
+    """
+    Returns the last stored {'etag', 'last_modified', 'result_row', 'links', 'fetched'} for a URL,
+    or None when nothing is cached, the entry has expired, or diskcache is not installed.
+    """
+    cache = _get_page_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.get(url)
+    except Exception:
+        return None
+
+def store_page_entry(url, etag, last_modified, result_row, links=()):
+    """
+    Stores an analyzed page together with the validators needed to revalidate it, and the
+    links that were checked so a revalidated page can check them again.
+    Entries expire after AUDIT_CACHE_TTL.
+    """
+    cache = _get_page_cache()
+    if cache is None or not (etag or last_modified):
+        return
+    try:
+        cache.set(url, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "result_row": copy.deepcopy(result_row),
+            "links": list(links),
+            "fetched": time.time(),
+        }, expire=AUDIT_CACHE_TTL)
+    except Exception:
+        pass
+
+# --- Gemini result cache (in memory) ---
+
+# Repeat clicks on the same URL reuse the last generation instead of paying for another LLM call
+LLM_CACHE_TTL = 600
+
+_llm_results = {}
+_llm_lock = threading.Lock()
+
+def _llm_key(kind, url, api_key):
+    # Results are kept per API key, so one user's generations are never served to another
+    key_digest = hashlib.sha256(api_key.encode()).hexdigest()
+    return hashlib.sha256(f"{kind}:{key_digest}:{url}".encode()).hexdigest()
+
+def get_llm_result(kind, url, api_key):
+    """Returns the cached result for (kind, url, api_key), or None if missing or older than LLM_CACHE_TTL."""
+    key = _llm_key(kind, url, api_key)
+    with _llm_lock:
+        entry = _llm_results.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.time() - stored_at > LLM_CACHE_TTL:
+            del _llm_results[key]
+            return None
+    return copy.deepcopy(result)
+
+def store_llm_result(kind, url, api_key, result):
+    with _llm_lock:
+        _llm_results[_llm_key(kind, url, api_key)] = (time.time(), copy.deepcopy(result))
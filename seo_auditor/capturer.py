@@ -1,4 +1,6 @@
 import os
+import time
+import hashlib
 import tempfile
 import subprocess
 import sys
@@ -7,9 +9,44 @@ import zipfile
 import shutil
 from playwright.async_api import async_playwright, Error as PlaywrightError
 from PIL import Image
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
 import io
 
+from .config import CAPTURE_CONCURRENCY
+from .utils import file_stamp
+
+# All capture folders live under one root so the UI can serve them as static files
+SCREENSHOT_ROOT = os.path.join(tempfile.gettempdir(), "seo_auditor_screenshots")
+
+# Captures are reused across the Capture and Schema tabs for a day. The cache sits outside
+# SCREENSHOT_ROOT so it is never served; each run links its pages into its own folder.
+SCREENSHOT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "seo_auditor_screenshot_cache")
+SCREENSHOT_CACHE_TTL = 24 * 3600
+CAPTURE_VIEWPORT = {"width": 1280, "height": 1024}
+
+def _screenshot_cache_path(url):
+    key = hashlib.sha1(f"{url}|{CAPTURE_VIEWPORT['width']}x{CAPTURE_VIEWPORT['height']}".encode()).hexdigest()
+    return os.path.join(SCREENSHOT_CACHE_DIR, f"{key}.png")
+
+def _cached_screenshot(url):
+    """Returns the cached capture for url, or None if there is none younger than SCREENSHOT_CACHE_TTL."""
+    path = _screenshot_cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) < SCREENSHOT_CACHE_TTL:
+            return path
+    except OSError:
+        pass
+    return None
+
+def _place_file(src, dst):
+    """Hard-links src to dst (replacing dst), copying when linking is not possible."""
+    try:
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
 def _install_browsers():
     """Installs playwright browsers if they are missing."""
     print("Installing Playwright browsers...")
@@ -37,10 +74,14 @@ def _install_deps():
         print(f"Failed to install dependencies: {e}")
         return False
 
-async def capture_screenshots(urls: list[str], progress=None, output_folder: str = None) -> tuple[str, list[str]]:
+async def capture_screenshots(urls: list[str], progress=None, output_folder: str = None, on_capture=None, max_concurrency=CAPTURE_CONCURRENCY, use_cache=True) -> tuple[str, list[str]]:
     """
     Captures full-page screenshots.
     FIX: Added '--disable-http2' to solve net::ERR_HTTP2_PROTOCOL_ERROR
+    on_capture(idx, filepath) is called as soon as each screenshot is saved.
+    At most max_concurrency pages are loading at any time.
+    With use_cache, URLs captured in the last SCREENSHOT_CACHE_TTL seconds are not reloaded,
+    and the browser is not started at all when every URL is cached.
     """
     # Updated arguments to fix Protocol Errors
     launch_args = [
@@ -55,11 +96,41 @@ async def capture_screenshots(urls: list[str], progress=None, output_folder: str
     ]
     
     if output_folder is None:
-        import time
-        timestamp = int(time.time())
-        output_folder = os.path.join(tempfile.gettempdir(), f"screenshots_{timestamp}")
+        output_folder = os.path.join(SCREENSHOT_ROOT, f"screenshots_{file_stamp()}")
     
     os.makedirs(output_folder, exist_ok=True)
+    os.makedirs(SCREENSHOT_CACHE_DIR, exist_ok=True)
+
+    results = []
+    total_count = len(urls)
+
+    def saved(idx, filepath):
+        results.append((idx, filepath))
+        if filepath and on_capture:
+            try:
+                on_capture(idx, filepath)
+            except Exception as e:
+                print(f"on_capture failed for {filepath}: {e}")
+        if progress:
+            try:
+                progress(len(results) / total_count, desc=f"📸 Captured {len(results)}/{total_count}")
+            except: pass
+
+    def collected():
+        results.sort(key=lambda x: x[0])
+        return (output_folder, [path for idx, path in results if path])
+
+    to_capture = []
+    for idx, url in enumerate(urls):
+        cached = _cached_screenshot(url) if use_cache else None
+        if cached:
+            filepath = os.path.join(output_folder, f"{idx + 1}.png")
+            _place_file(cached, filepath)
+            saved(idx, filepath)
+        else:
+            to_capture.append((idx, url))
+    if not to_capture:
+        return collected()
 
     async with async_playwright() as p:
         browser = None
@@ -75,14 +146,14 @@ async def capture_screenshots(urls: list[str], progress=None, output_folder: str
                      try:
                         browser = await p.chromium.launch(args=launch_args)
                      except:
-                        return (output_folder, [])
+                        return collected()
             else:
-                return (output_folder, [])
+                return collected()
 
         try:
             # Create a more "human-like" context
             context = await browser.new_context(
-                viewport={"width": 1280, "height": 1024},
+                viewport=CAPTURE_VIEWPORT,
                 ignore_https_errors=True,
                 user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
                 java_script_enabled=True
@@ -91,7 +162,7 @@ async def capture_screenshots(urls: list[str], progress=None, output_folder: str
             # Block heavy resources that might cause timeouts/errors
             await context.route("**/*.{media,mp4,mp3,woff,woff2}", lambda route: route.abort())
 
-            sem = asyncio.Semaphore(5)
+            sem = asyncio.Semaphore(max(1, int(max_concurrency)))
 
             async def capture_task(idx, url):
                 async with sem:
@@ -113,52 +184,141 @@ async def capture_screenshots(urls: list[str], progress=None, output_folder: str
                         await page.screenshot(path=filepath, full_page=True)
                         await page.close()
                         print(f"Saved: {filename}")
+                        try:
+                            _place_file(filepath, _screenshot_cache_path(url))
+                        except OSError as e:
+                            print(f"Could not cache screenshot for {url}: {e}")
                         return (idx, filepath)
                     except Exception as e:
                         print(f"ERROR: Failed to capture {url}: {e}")
                         return (idx, None)
 
-            tasks = [capture_task(i, url) for i, url in enumerate(urls)]
+            tasks = [capture_task(i, url) for i, url in to_capture]
 
-            results = []
-            completed_count = 0
-            total_count = len(urls)
-            
             for f in asyncio.as_completed(tasks):
-                res = await f
-                results.append(res)
-                completed_count += 1
-                if progress:
-                    try:
-                        progress(completed_count / total_count, desc=f"📸 Captured {completed_count}/{total_count}")
-                    except: pass
+                saved(*await f)
         finally:
             if browser:
                 await browser.close()
 
-    results.sort(key=lambda x: x[0])
-    screenshot_paths = [path for idx, path in results if path]
-    return (output_folder, screenshot_paths)
-def _compress_image(path):
+    return collected()
+
+# PDF page settings shared by the encoding workers and the PDF writer
+PDF_MAX_WIDTH = 2000
+PDF_JPEG_QUALITY = 80
+PDF_RESOLUTION = 100.0
+# Below this many pages, starting worker processes costs more than it saves
+PDF_POOL_MIN_PAGES = 4
+
+def _encode_page(path):
+    """
+    Decodes a screenshot, downscales it and re-encodes it as JPEG.
+    Runs in a worker process; returns (jpeg_bytes, width, height) or None.
+    """
     try:
-        img = Image.open(path)
-        size_kb = os.path.getsize(path) / 1024
-        if size_kb < 100:
-            return img.convert('RGB') if img.mode == 'RGBA' else img
-        
-        if img.mode == 'RGBA':
+        with Image.open(path) as img:
             img = img.convert('RGB')
-        
-        if img.width > 2000:
-            ratio = 2000 / img.width
-            new_size = (int(img.width * ratio), int(img.height * ratio))
-            img = img.resize(new_size, Image.Resampling.LANCZOS)
-        
-        return img
+            if img.width > PDF_MAX_WIDTH:
+                ratio = PDF_MAX_WIDTH / img.width
+                new_size = (PDF_MAX_WIDTH, int(img.height * ratio))
+                img = img.resize(new_size, Image.Resampling.LANCZOS)
+
+            buffer = io.BytesIO()
+            img.save(buffer, "JPEG", quality=PDF_JPEG_QUALITY, optimize=True)
+            return buffer.getvalue(), img.width, img.height
     except Exception as e:
         print(f"Failed to compress image {path}: {e}")
         return None
 
+def _write_jpeg_pdf(pages, output_filename):
+    """
+    Writes pre-encoded JPEG pages into a PDF container.
+    The JPEG streams are embedded as-is (DCTDecode), so no pixel work happens here.
+    """
+    offsets = []
+    with open(output_filename, "wb") as f:
+        def write_obj(body, stream=None):
+            offsets.append(f.tell())
+            f.write(f"{len(offsets)} 0 obj\n".encode())
+            f.write(body)
+            if stream is not None:
+                f.write(b"\nstream\n")
+                f.write(stream)
+                f.write(b"\nendstream")
+            f.write(b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        # Objects 1 and 2 are the catalog and page tree; each page then uses 3 objects
+        page_refs = " ".join(f"{5 + 3 * i} 0 R" for i in range(len(pages)))
+        write_obj(b"<< /Type /Catalog /Pages 2 0 R >>")
+        write_obj(f"<< /Type /Pages /Kids [{page_refs}] /Count {len(pages)} >>".encode())
+
+        for i, (jpeg_bytes, width, height) in enumerate(pages):
+            image_ref, content_ref = 3 + 3 * i, 4 + 3 * i
+            # Page size in points for the configured DPI
+            pt_w = width * 72.0 / PDF_RESOLUTION
+            pt_h = height * 72.0 / PDF_RESOLUTION
+            content = f"q {pt_w:.2f} 0 0 {pt_h:.2f} 0 0 cm /Im0 Do Q".encode()
+
+            write_obj(
+                f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode "
+                f"/Length {len(jpeg_bytes)} >>".encode(),
+                jpeg_bytes
+            )
+            write_obj(f"<< /Length {len(content)} >>".encode(), content)
+            write_obj(
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {pt_w:.2f} {pt_h:.2f}] "
+                f"/Resources << /XObject << /Im0 {image_ref} 0 R >> >> "
+                f"/Contents {content_ref} 0 R >>".encode()
+            )
+
+        xref_offset = f.tell()
+        f.write(f"xref\n0 {len(offsets) + 1}\n".encode())
+        f.write(b"0000000000 65535 f \n")
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\n".encode())
+        f.write(f"startxref\n{xref_offset}\n%%EOF\n".encode())
+
+class PdfPageEncoder:
+    """
+    Encodes screenshots for the PDF in worker processes while the capture is still running,
+    so only the container write is left once the last page is saved.
+    The pool is only started on the first submit, and only for runs of at least
+    PDF_POOL_MIN_PAGES pages; smaller runs are encoded in-process by result().
+    """
+    def __init__(self, expected_pages, max_workers=None):
+        self._background = expected_pages >= PDF_POOL_MIN_PAGES
+        self._max_workers = min(expected_pages, max_workers or os.cpu_count() or 1)
+        self._executor = None
+        self._futures = {}
+
+    def submit(self, path):
+        if not self._background or path in self._futures:
+            return
+        try:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            self._futures[path] = self._executor.submit(_encode_page, path)
+        except Exception as e:
+            # Pool could not start; result() encodes in-process instead
+            print(f"Background encoding unavailable for {path}: {e}")
+
+    def result(self, path):
+        future = self._futures.get(path)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as e:
+                print(f"Background encoding failed for {path}: {e}")
+        return _encode_page(path)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
 def create_zip(folder_path: str, output_filename: str = None) -> str:
     if not folder_path or not os.path.exists(folder_path):
         return None
@@ -173,8 +333,7 @@ def create_zip(folder_path: str, output_filename: str = None) -> str:
         return None
     
     if output_filename is None:
-        import time
-        output_filename = f"screenshots_{int(time.time())}.zip"
+        output_filename = f"screenshots_{file_stamp()}.zip"
     
     try:
         with zipfile.ZipFile(output_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
@@ -186,41 +345,33 @@ def create_zip(folder_path: str, output_filename: str = None) -> str:
         print(f"ZIP creation error: {e}")
         return None
 
-def create_pdf(image_paths: list[str], output_filename: str) -> str:
+def create_pdf(image_paths: list[str], output_filename: str, encoder: PdfPageEncoder = None) -> str:
     if not image_paths:
         print("Error: No image paths provided for PDF creation.")
         return None
 
     try:
-        images = []
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            compressed = list(executor.map(_compress_image, image_paths))
-            images = [img for img in compressed if img is not None]
-
-        if not images:
-            print("Error: No valid images processed for PDF.")
-            return None
-
-        jpeg_images = []
-        for img in images:
+        if encoder is not None:
+            # Pages were (mostly) encoded during capture; this only collects them
+            encoded = [encoder.result(path) for path in image_paths]
+        elif len(image_paths) < PDF_POOL_MIN_PAGES:
+            encoded = [_encode_page(path) for path in image_paths]
+        else:
+            # Image decode/resize/encode is CPU-bound, so use processes to get past the GIL
+            workers = min(len(image_paths), os.cpu_count() or 1)
             try:
-                jpeg_img = img.convert('RGB')
-                jpeg_images.append(jpeg_img)
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    encoded = list(executor.map(_encode_page, image_paths))
             except Exception as e:
-                print(f"Conversion error: {e}")
+                print(f"Process pool unavailable, encoding in-process: {e}")
+                encoded = [_encode_page(path) for path in image_paths]
 
-        if not jpeg_images:
+        pages = [page for page in encoded if page is not None]
+        if not pages:
+            print("Error: No valid images processed for PDF.")
             return None
 
-        jpeg_images[0].save(
-            output_filename,
-            "PDF",
-            resolution=100.0,
-            save_all=True,
-            append_images=jpeg_images[1:],
-            optimize=True,
-            quality=80
-        )
+        _write_jpeg_pdf(pages, output_filename)
         return output_filename
     except Exception as e:
         print(f"PDF creation error: {e}")
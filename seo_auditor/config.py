@@ -2,5 +2,15 @@
 
 USER_AGENT = "Mozilla/5.0 (compatible; SEOAuditor/6.0; +https://example.com/bot)"
 TIMEOUT = 10
+URL_SCHEMES = ("http://", "https://")  # Anything else gets https:// prepended
 MAX_PAGES_TO_SCAN = 50
+MAX_AUDIT_WORKERS = 16  # Pages analyzed concurrently
+MAX_AUDIT_WORKERS_LIMIT = 32  # Upper bound for the user-set worker count
+CAPTURE_CONCURRENCY = 5  # Pages loaded at once during screenshot capture
+CAPTURE_CONCURRENCY_LIMIT = 8  # Upper bound for the user-set capture concurrency
 MAX_BROKEN_LINK_CHECKS = 20  # Limit to avoid long wait times
+MAX_ROWS_PER_SHEET = 100_000  # Larger audits are split across several sheets
+AUDIT_CACHE_DIR = ".audit_cache"  # ETag/Last-Modified cache for re-audits
+AUDIT_CACHE_TTL = 7 * 24 * 3600  # Cached pages are re-fetched in full after this long
+AUDIT_CACHE_SIZE_LIMIT = 256 * 1024 * 1024  # Least recently stored pages are evicted beyond this
+MAX_HTML_BYTES = 2 * 1024 * 1024  # Larger HTML bodies are truncated before parsing
@@ -1,47 +1,68 @@
-from bs4 import BeautifulSoup
+from lxml import etree
 from .config import TIMEOUT
-from .utils import get_session
+from .utils import get_shared_session
 
-# Initialize session once or per request? Using shared session for now.
-session = get_session()
-
-def check_robots_txt(base_url):
+def check_robots_txt(base_url, session=None):
     """
     Checks if robots.txt exists.
     Returns True if status code is 200.
     """
+    session = session or get_shared_session()
     try:
         r = session.get(f"{base_url.rstrip('/')}/robots.txt", timeout=TIMEOUT)
         return r.status_code == 200
     except:
         return False
 
-def fetch_sitemap_urls(sitemap_url, collected=None):
+def _localname(tag):
+    # Comments and processing instructions have non-string tags
+    return tag.rpartition("}")[2] if isinstance(tag, str) else ""
+
+def iter_sitemap_urls(sitemap_url, session=None, seen=None):
     """
-    Recursively fetches URLs from a sitemap.
+    Yields page URLs from a sitemap in document order, following nested sitemaps.
+    The response is parsed as it streams in, so memory stays flat on large sitemaps.
+    Each URL is yielded once, and a sitemap index that links back to itself is not re-fetched.
     """
-    if collected is None:
-        collected = set()
+    session = session or get_shared_session()
+    if seen is None:
+        seen = set()
+    if sitemap_url in seen:
+        return
+    seen.add(sitemap_url)
     try:
-        r = session.get(sitemap_url, timeout=TIMEOUT)
-        if r.status_code != 200:
-            return collected
+        with session.get(sitemap_url, timeout=TIMEOUT, stream=True) as r:
+            if r.status_code != 200:
+                return
+            r.raw.decode_content = True
 
-        # Using lxml-xml or xml parser
-        soup = BeautifulSoup(r.content, "xml")
+            # One pass handles both <urlset> and <sitemapindex> files
+            for _, elem in etree.iterparse(r.raw, events=("end",), tag=("{*}url", "{*}sitemap"), recover=True):
+                loc = next((child.text for child in elem if _localname(child.tag) == "loc"), None)
+                is_index_entry = _localname(elem.tag) == "sitemap"
 
-        # Handle nested sitemaps
-        for sitemap in soup.find_all("sitemap"):
-            loc = sitemap.find("loc")
-            if loc:
-                fetch_sitemap_urls(loc.text.strip(), collected)
+                # Drop the parsed subtree before handing control back to the caller
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
 
-        # Handle urls
-        for url in soup.find_all("url"):
-            loc = url.find("loc")
-            if loc:
-                collected.add(loc.text.strip())
+                loc = loc.strip() if loc else ""
+                if not loc:
+                    continue
+                if is_index_entry:
+                    yield from iter_sitemap_urls(loc, session, seen)
+                elif loc not in seen:
+                    seen.add(loc)
+                    yield loc
 
     except Exception:
-        pass
+        return
+
+def fetch_sitemap_urls(sitemap_url, collected=None, session=None):
+    """
+    Recursively fetches URLs from a sitemap.
+    """
+    if collected is None:
+        collected = set()
+    collected.update(iter_sitemap_urls(sitemap_url, session, set(collected)))
     return collected
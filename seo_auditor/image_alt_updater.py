@@ -1,11 +1,13 @@
-import requests
 import os
 import re
+import orjson
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-from .utils import get_session
+from concurrent.futures import ThreadPoolExecutor
+from .utils import get_shared_session
+from .wp_handler import get_wp_session, wp_auth_header, WP_HEADERS
 
-def find_attachment_id_by_url(image_url, base_url, auth):
+def find_attachment_id_by_url(image_url, base_url, auth_header):
     """
     Queries WordPress API to find attachment ID by image URL.
     """
@@ -22,14 +24,16 @@ def find_attachment_id_by_url(image_url, base_url, auth):
         api_url = f"{base_url}/wp-json/wp/v2/media"
         params = {
             "search": clean_name,
-            "per_page": 20
+            "per_page": 20,
+            # Only the fields matched below; skips rendered captions and descriptions
+            "_fields": "id,source_url,media_details"
         }
 
-        resp = requests.get(api_url, params=params, auth=auth, timeout=10)
+        resp = get_wp_session().get(api_url, params=params, headers=auth_header, timeout=10)
         if resp.status_code != 200:
             return None
 
-        media_items = resp.json()
+        media_items = orjson.loads(resp.content)
 
         for item in media_items:
             # Check full size URL
@@ -59,7 +63,7 @@ def fetch_page_images(page_url, username=None, app_password=None):
     Returns a list of dicts with image info: {url, current_alt, attachment_id}
     If username/app_password are provided, it will attempt to find missing attachment IDs via API.
     """
-    session = get_session()
+    session = get_shared_session()
     
     try:
         resp = session.get(page_url, timeout=10)
@@ -75,7 +79,7 @@ def fetch_page_images(page_url, username=None, app_password=None):
         if username and app_password:
             parsed = urlparse(page_url)
             base_url = f"{parsed.scheme}://{parsed.netloc}"
-            auth = (username, app_password)
+            auth = wp_auth_header(username, app_password)
 
         for img in soup.find_all('img'):
             img_src = img.get('src', '')
@@ -119,6 +123,9 @@ def fetch_page_images(page_url, username=None, app_password=None):
         print(f"Error fetching images: {e}")
         return []
 
+# Concurrent media updates against one WordPress host
+ALT_UPDATE_WORKERS = 4
+
 def update_image_alts(page_url, username, app_password, image_updates):
     """
     Updates alt text for images on a WordPress page.
@@ -128,21 +135,16 @@ def update_image_alts(page_url, username, app_password, image_updates):
     parsed = urlparse(page_url)
     base_url = f"{parsed.scheme}://{parsed.netloc}"
     
-    auth = (username, app_password)
-    headers = {
-        "Content-Type": "application/json",
-        "User-Agent": "Gemini-SEO-Updater/1.0"
-    }
-    
-    results = []
+    headers = {**WP_HEADERS, **wp_auth_header(username, app_password)}
     
-    for update in image_updates:
+    session = get_wp_session()
+
+    def update_one(update):
         attachment_id = update.get('attachment_id')
         new_alt = update.get('new_alt', '')
         
         if not attachment_id:
-            results.append(f"⚠️ Skipped image (no ID found)")
-            continue
+            return f"⚠️ Skipped image (no ID found)"
         
         try:
             # Update via WordPress REST API
@@ -152,14 +154,18 @@ def update_image_alts(page_url, username, app_password, image_updates):
                 "alt_text": new_alt
             }
             
-            resp = requests.post(update_url, auth=auth, json=payload, headers=headers, timeout=10)
+            resp = session.post(update_url, data=orjson.dumps(payload), params={"_fields": "id"}, headers=headers, timeout=10)
             
             if resp.status_code == 200:
-                results.append(f"✅ Updated image ID {attachment_id}")
+                return f"✅ Updated image ID {attachment_id}"
             else:
-                results.append(f"❌ Failed to update ID {attachment_id}: {resp.status_code}")
+                return f"❌ Failed to update ID {attachment_id}: {resp.status_code}"
         
         except Exception as e:
-            results.append(f"❌ Error updating ID {attachment_id}: {str(e)}")
+            return f"❌ Error updating ID {attachment_id}: {str(e)}"
+
+    # A few updates in flight at once; more tends to trip host rate limits. map keeps input order.
+    with ThreadPoolExecutor(max_workers=ALT_UPDATE_WORKERS) as executor:
+        results = list(executor.map(update_one, image_updates))
     
     return True, "\n".join(results)
@@ -2,7 +2,34 @@ import google.generativeai as genai
 from bs4 import BeautifulSoup
 import re
 import json
-from .utils import get_session
+import orjson
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from .utils import get_shared_session, configure_gemini, normalize_url
+from .cache import get_llm_result, store_llm_result
+
+# Pages are fetched and prompted in parallel; LLM calls are spaced to stay under the RPM quota
+META_GEN_WORKERS = 8
+GEMINI_RPM = 60
+# Page fetches use the whole pool, but at most this many LLM requests are in flight at once
+GEMINI_MAX_CONCURRENT = 5
+# Pages described in a single prompt, so the instructions are sent once per batch
+META_BATCH_SIZE = 10
+
+_rate_lock = threading.Lock()
+_llm_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENT)
+_next_call_at = 0.0
+
+def _wait_for_rate_limit():
+    """Blocks until the next LLM call fits within GEMINI_RPM."""
+    global _next_call_at
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_call_at - now
+        _next_call_at = max(now, _next_call_at) + 60.0 / GEMINI_RPM
+    if wait > 0:
+        time.sleep(wait)
 
 def clean_json_text(text: str) -> str:
     """
@@ -15,126 +42,247 @@ def clean_json_text(text: str) -> str:
         text = re.sub(r"^```(json)?|```$", "", text, flags=re.MULTILINE).strip()
     return text
 
-def generate_meta_tags(urls: list[str], api_key: str):
-    if not api_key:
-        return []
+def _error_row(url):
+    return {
+        "URL": url,
+        "Old Title": "Error",
+        "New Title": "",
+        "Old Desc": "Error",
+        "New Desc": ""
+    }
+
+def _page_context(url, session):
+    """
+    Fetches one page and extracts what the prompt needs.
+    Returns (context, None) on success or (None, result_row) when the page can't be used.
+    """
+    try:
+        # 1. Fetch Page Content
+        resp = session.get(url, timeout=10)
+        if resp.status_code >= 400:
+            return None, {"URL": url, "New Title": "Error", "New Desc": "Error"}
+
+        soup = BeautifulSoup(resp.text, "lxml")
+
+        # 2. Extract Current Metadata (Robust Scraping)
+        old_title = soup.title.string.strip() if (soup.title and soup.title.string) else ""
+
+        old_desc = ""
+        # Look for standard description OR og:description as backup
+        meta = soup.find("meta", attrs={"name": re.compile("description", re.I)})
+        if not meta:
+            meta = soup.find("meta", attrs={"property": re.compile("og:description", re.I)})
+
+        if meta and meta.get("content"):
+            old_desc = meta.get("content").strip()
+
+        # 3. Extract Context (Enhanced for Gallery Pages)
+        # Since your example is a gallery, it might not have many <p> tags.
+        # We add H2s and Image Alts to give the AI more context.
+        h1 = soup.find("h1")
+        h1_text = h1.get_text(strip=True) if h1 else ""
+
+        paragraphs = [p.get_text(strip=True) for p in soup.find_all("p")[:5]]
+
+        # Also grab some image alt text if paragraphs are scarce (helpful for galleries)
+        images = [img.get('alt', '') for img in soup.find_all('img', alt=True)[:5]]
+
+        content_snippet = f"H1: {h1_text}\nContent: {' '.join(paragraphs)}\nImages: {' '.join(images)}"
+        return {"url": url, "old_title": old_title, "old_desc": old_desc, "snippet": content_snippet}, None
+
+    except Exception as e:
+        print(f"Error processing {url}: {e}")
+        return None, _error_row(url)
+
+def _result_row(ctx, new_title, new_desc):
+    # If AI returns empty string, keep old
+    return {
+        "URL": ctx["url"],
+        "Old Title": ctx["old_title"],
+        "New Title": new_title or ctx["old_title"],
+        "Old Desc": ctx["old_desc"],
+        "New Desc": new_desc or ctx["old_desc"]
+    }
+
+def _generate_for_context(ctx, model):
+    """Prompts the model for a single page."""
+    url = ctx["url"]
+    try:
+        # 4. Generate
+        prompt = f"""
+        You are an SEO Expert.
+        Analyze this webpage context and current meta tags.
+
+        URL: {url}
+        Current Title: {ctx["old_title"]}
+        Current Description: {ctx["old_desc"]}
+        Page Context: {ctx["snippet"]}
+
+        Task:
+        1. Create a BETTER Meta Title (max 60 chars, compelling, keyword-rich).
+        2. Create a BETTER Meta Description (max 160 chars, actionable, summarizes content).
+
+        IMPORTANT: Return raw JSON only. No markdown formatting.
+        Structure:
+        {{
+            "title": "New Title Here",
+            "description": "New Description Here"
+        }}
+        """
+
+        with _llm_slots:
+            _wait_for_rate_limit()
+            response = model.generate_content(prompt)
+
+        # 5. Parse Safely
+        cleaned_text = clean_json_text(response.text)
+
+        new_title = ctx["old_title"]
+        new_desc = ctx["old_desc"]
+
+        try:
+            data = json.loads(cleaned_text)
+            new_title = data.get("title", new_title)
+            new_desc = data.get("description", new_desc)
+
+        except json.JSONDecodeError as e:
+            print(f"JSON Error for {url}: {e}")
+            # Fallback: Try regex if JSON fails
+            title_match = re.search(r'"title":\s*"(.*?)"', cleaned_text)
+            desc_match = re.search(r'"description":\s*"(.*?)"', cleaned_text)
+            if title_match: new_title = title_match.group(1)
+            if desc_match: new_desc = desc_match.group(1)
+
+        return _result_row(ctx, new_title, new_desc)
+
+    except Exception as e:
+        print(f"Error processing {url}: {e}")
+        return _error_row(url)
+
+def generate_meta_tag(url, model, session=None):
+    """Fetches one page and asks the model for a better title and description."""
+    ctx, error_row = _page_context(normalize_url(url), session or get_shared_session())
+    if error_row:
+        return error_row
+    return _generate_for_context(ctx, model)
+
+def generate_meta_batch(contexts, model):
+    """
+    Asks for titles and descriptions for several pages in one prompt.
+    Returns one result row per context, in order. Pages missing from the reply,
+    or the whole batch if the reply isn't a JSON array, are retried one prompt per page.
+    """
+    if len(contexts) == 1:
+        return [_generate_for_context(contexts[0], model)]
+
+    pages = "\n\n".join(
+        f"URL: {ctx['url']}\nCurrent Title: {ctx['old_title']}\n"
+        f"Current Description: {ctx['old_desc']}\nPage Context: {ctx['snippet']}"
+        for ctx in contexts
+    )
+    prompt = f"""
+    You are an SEO Expert.
+    Analyze each webpage's context and current meta tags below.
+
+    {pages}
+
+    Task, for EVERY page above:
+    1. Create a BETTER Meta Title (max 60 chars, compelling, keyword-rich).
+    2. Create a BETTER Meta Description (max 160 chars, actionable, summarizes content).
+
+    IMPORTANT: Return raw JSON only. No markdown formatting.
+    Structure: a JSON array with one object per page, using the page's URL exactly as given:
+    [
+        {{"url": "https://...", "title": "New Title Here", "description": "New Description Here"}}
+    ]
+    """
+
+    suggestions = {}
+    try:
+        with _llm_slots:
+            _wait_for_rate_limit()
+            response = model.generate_content(prompt)
+        data = orjson.loads(clean_json_text(response.text))
+        for item in data if isinstance(data, list) else []:
+            if isinstance(item, dict) and item.get("url"):
+                suggestions[item["url"]] = item
+    except Exception as e:
+        print(f"Batch prompt failed for {len(contexts)} pages, retrying individually: {e}")
 
-    genai.configure(api_key=api_key)
+    results = []
+    for ctx in contexts:
+        item = suggestions.get(ctx["url"])
+        if item is None:
+            results.append(_generate_for_context(ctx, model))
+        else:
+            results.append(_result_row(ctx, item.get("title"), item.get("description")))
+    return results
+
+def _meta_model(api_key):
+    configure_gemini(api_key)
     
     # Use JSON mode for structure
     generation_config = {
         "response_mime_type": "application/json",
     }
     
-    model = genai.GenerativeModel('gemini-2.5-flash', generation_config=generation_config)
-    session = get_session()
+    return genai.GenerativeModel('gemini-2.5-flash', generation_config=generation_config)
 
-    results = []
+def iter_meta_tags(urls: list[str], api_key: str, max_workers=META_GEN_WORKERS, force=False):
+    """
+    Yields (index, result) pairs as each URL finishes, where index is the URL's
+    position among the non-empty entries of urls.
+    Recently generated URLs are answered from the cache unless force is set.
+    Pages are fetched concurrently and prompted META_BATCH_SIZE at a time.
+    """
+    if not api_key:
+        return
 
-    for url in urls:
-        url = url.strip()
-        if not url: continue
-        
-        if not url.startswith("http"):
-            url = "https://" + url
+    urls = [u.strip() for u in urls if u.strip()]
+    if not urls:
+        return
 
-        try:
-            # 1. Fetch Page Content
-            resp = session.get(url, timeout=10)
-            if resp.status_code >= 400:
-                results.append({"URL": url, "New Title": "Error", "New Desc": "Error"})
-                continue
-
-            soup = BeautifulSoup(resp.text, "lxml")
-
-            # 2. Extract Current Metadata (Robust Scraping)
-            old_title = soup.title.string.strip() if (soup.title and soup.title.string) else ""
-
-            old_desc = ""
-            # Look for standard description OR og:description as backup
-            meta = soup.find("meta", attrs={"name": re.compile("description", re.I)})
-            if not meta:
-                meta = soup.find("meta", attrs={"property": re.compile("og:description", re.I)})
-            
-            if meta and meta.get("content"):
-                old_desc = meta.get("content").strip()
-
-            # 3. Extract Context (Enhanced for Gallery Pages)
-            # Since your example is a gallery, it might not have many <p> tags.
-            # We add H2s and Image Alts to give the AI more context.
-            h1 = soup.find("h1")
-            h1_text = h1.get_text(strip=True) if h1 else ""
-            
-            paragraphs = [p.get_text(strip=True) for p in soup.find_all("p")[:5]]
-            
-            # Also grab some image alt text if paragraphs are scarce (helpful for galleries)
-            images = [img.get('alt', '') for img in soup.find_all('img', alt=True)[:5]]
-            
-            content_snippet = f"H1: {h1_text}\nContent: {' '.join(paragraphs)}\nImages: {' '.join(images)}"
-
-            # 4. Generate
-            prompt = f"""
-            You are an SEO Expert.
-            Analyze this webpage context and current meta tags.
-            
-            URL: {url}
-            Current Title: {old_title}
-            Current Description: {old_desc}
-            Page Context: {content_snippet}
-
-            Task:
-            1. Create a BETTER Meta Title (max 60 chars, compelling, keyword-rich).
-            2. Create a BETTER Meta Description (max 160 chars, actionable, summarizes content).
-
-            IMPORTANT: Return raw JSON only. No markdown formatting.
-            Structure:
-            {{
-                "title": "New Title Here",
-                "description": "New Description Here"
-            }}
-            """
+    # Cache hits come back immediately; only misses are sent to Gemini
+    misses = []
+    for i, url in enumerate(urls):
+        cached = None if force else get_llm_result("meta", url, api_key)
+        if cached is not None:
+            yield i, cached
+        else:
+            misses.append((i, url))
+    if not misses:
+        return
 
-            response = model.generate_content(prompt)
-            
-            # 5. Parse Safely
-            cleaned_text = clean_json_text(response.text)
-            
-            new_title = old_title
-            new_desc = old_desc
-
-            try:
-                data = json.loads(cleaned_text)
-                new_title = data.get("title", old_title)
-                new_desc = data.get("description", old_desc)
-                
-                # Double check: if AI returns empty string, keep old
-                if not new_title: new_title = old_title
-                if not new_desc: new_desc = old_desc
-
-            except json.JSONDecodeError as e:
-                print(f"JSON Error for {url}: {e}")
-                # Fallback: Try regex if JSON fails
-                title_match = re.search(r'"title":\s*"(.*?)"', cleaned_text)
-                desc_match = re.search(r'"description":\s*"(.*?)"', cleaned_text)
-                if title_match: new_title = title_match.group(1)
-                if desc_match: new_desc = desc_match.group(1)
-
-            results.append({
-                "URL": url,
-                "Old Title": old_title,
-                "New Title": new_title,
-                "Old Desc": old_desc,
-                "New Desc": new_desc
-            })
-
-        except Exception as e:
-            print(f"Error processing {url}: {e}")
-            results.append({
-                "URL": url,
-                "Old Title": "Error",
-                "New Title": "",
-                "Old Desc": "Error",
-                "New Desc": ""
-            })
+    model = _meta_model(api_key)
+    session = get_shared_session()
 
-    return results
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(misses))) as executor:
+        pending = {executor.submit(_page_context, normalize_url(url), session): ("fetch", (i, url)) for i, url in misses}
+        ready = []  # [(index, url, context)] waiting for a batch
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, job = pending.pop(future)
+                if kind == "fetch":
+                    i, url = job
+                    ctx, error_row = future.result()
+                    if error_row:
+                        yield i, error_row
+                    else:
+                        ready.append((i, url, ctx))
+                    continue
+
+                for (i, url, _), result in zip(job, future.result()):
+                    if "Error" not in (result.get("New Title"), result.get("Old Title")):
+                        store_llm_result("meta", url, api_key, result)
+                    yield i, result
+
+            # Full batches go out as soon as they fill; the remainder once every page is fetched
+            fetching = any(kind == "fetch" for kind, _ in pending.values())
+            while len(ready) >= META_BATCH_SIZE or (ready and not fetching):
+                batch, ready = ready[:META_BATCH_SIZE], ready[META_BATCH_SIZE:]
+                pending[executor.submit(generate_meta_batch, [ctx for _, _, ctx in batch], model)] = ("batch", batch)
+
+def generate_meta_tags(urls: list[str], api_key: str):
+    results = dict(iter_meta_tags(urls, api_key))
+    return [results[i] for i in sorted(results)]
@@ -1,11 +1,71 @@
+import numpy as np
 import pandas as pd
 import time
 
+from .config import MAX_ROWS_PER_SHEET
+
+# Keys of an analyze_page result, in the order analyze_page builds them
+AUDIT_COLUMNS = [
+    "url", "status_code", "status_type",
+    "https_ok", "page_size_kb", "schema_types",
+    "title", "title_len", "meta_description", "meta_description_len",
+    "h1_text", "h1_count", "word_count", "canonical",
+    "internal_links", "external_links", "internal_broken_links", "external_broken_links",
+    "load_time_s", "cached_result",
+    "multiple_title_tags", "h1_equals_title", "sequential_h1_error", "missing_alt_count",
+    "issues_found",
+]
+
+# Compact dtypes for the numeric/flag columns produced by analyze_page
+COLUMN_DTYPES = {
+    "status_code": "int16",
+    "https_ok": "bool",
+    "cached_result": "bool",
+    "title_len": "int32",
+    "meta_description_len": "int32",
+    "h1_count": "int32",
+    "word_count": "int32",
+    "internal_links": "int32",
+    "external_links": "int32",
+    "internal_broken_links": "int32",
+    "external_broken_links": "int32",
+    "missing_alt_count": "int32",
+    "multiple_title_tags": "bool",
+    "h1_equals_title": "bool",
+    "sequential_h1_error": "bool",
+}
+
+def build_audit_frame(results):
+    """
+    Builds the audit frame from analyze_page results column by column.
+    Numeric/flag columns get their COLUMN_DTYPES array directly instead of per-row inference.
+    """
+    if not results:
+        return pd.DataFrame()
+
+    known = set(AUDIT_COLUMNS)
+    extra = list(dict.fromkeys(k for r in results for k in r.keys() - known))
+
+    columns = {}
+    for col in AUDIT_COLUMNS + extra:
+        values = [r.get(col) for r in results]
+        dtype = COLUMN_DTYPES.get(col)
+        if dtype and None not in values:
+            columns[col] = np.array(values, dtype=dtype)
+        else:
+            columns[col] = values
+    return pd.DataFrame(columns)
+
 def prepare_dataframe(df):
     """
     Organizes columns for both Display and Excel.
     Ensures NOTHING is dropped.
     """
+    # One cast for all known columns instead of leaving them as inferred int64/object
+    dtypes = {c: t for c, t in COLUMN_DTYPES.items() if c in df.columns and df[c].dtype != t and df[c].notna().all()}
+    if dtypes:
+        df = df.astype(dtypes)
+
     priority_cols = [
         "url", "status_code", "status_type",
         "https_ok", "page_size_kb", "schema_types",
@@ -14,7 +74,7 @@ def prepare_dataframe(df):
         "meta_description", "meta_description_len",
         "word_count", "internal_links", "external_links",
         "internal_broken_links", "external_broken_links",
-        "load_time_s", "issues_found"
+        "load_time_s", "cached_result", "issues_found"
     ]
     all_cols = list(df.columns)
     # Append any columns that are in df but not in priority_cols
@@ -29,18 +89,18 @@ def prepare_dataframe(df):
 
     return df[final_cols]
 
-def save_excel(df, filename):
-    writer = pd.ExcelWriter(filename, engine='xlsxwriter')
-    workbook = writer.book
-    df.to_excel(writer, sheet_name='Audit', index=False)
-    ws = writer.sheets['Audit']
-
-    header = workbook.add_format({'bold': True, 'bg_color': '#2c3e50', 'font_color': 'white'})
-    bad = workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'})
-    # warn = workbook.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C6500'})
+def _write_sheet(ws, df, header):
+    """
+    Writes the header and rows strictly top to bottom, as constant_memory mode requires
+    (DataFrame.to_excel emits cells column by column, which that mode would drop).
+    """
+    ws.write_row(0, 0, list(df.columns), header)
+    # Object dtype turns numpy scalars into plain Python values; missing values become blanks
+    rows = df.astype(object).where(df.notna(), None)
+    for r, row in enumerate(rows.itertuples(index=False, name=None), start=1):
+        ws.write_row(r, 0, row)
 
-    for i, col in enumerate(df.columns):
-        ws.write(0, i, col, header)
+def _format_sheet(ws, df, header, bad):
     ws.set_column('A:A', 40)
 
     if "https_ok" in df.columns:
@@ -55,5 +115,34 @@ def save_excel(df, filename):
         idx = df.columns.get_loc("external_broken_links")
         ws.conditional_format(1, idx, len(df), idx, {'type': 'cell', 'criteria': '>', 'value': 0, 'format': bad})
 
+def save_excel(df, filename):
+    """
+    Writes the audit to an .xlsx file.
+    Audits longer than MAX_ROWS_PER_SHEET are split into Pages_001, Pages_002, ... sheets.
+    Rows are streamed to disk as they are written, so memory stays flat on large audits.
+    """
+    # strings_to_urls=False skips URL detection on every cell; URL columns stay plain text
+    writer = pd.ExcelWriter(filename, engine='xlsxwriter', engine_kwargs={
+        'options': {'constant_memory': True, 'strings_to_urls': False}
+    })
+    workbook = writer.book
+
+    header = workbook.add_format({'bold': True, 'bg_color': '#2c3e50', 'font_color': 'white'})
+    bad = workbook.add_format({'bg_color': '#FFC7CE', 'font_color': '#9C0006'})
+    # warn = workbook.add_format({'bg_color': '#FFEB9C', 'font_color': '#9C6500'})
+
+    if len(df) <= MAX_ROWS_PER_SHEET:
+        shards = [('Audit', df)]
+    else:
+        shards = [
+            (f"Pages_{n:03d}", df.iloc[start:start + MAX_ROWS_PER_SHEET])
+            for n, start in enumerate(range(0, len(df), MAX_ROWS_PER_SHEET), start=1)
+        ]
+
+    for sheet_name, part in shards:
+        ws = workbook.add_worksheet(sheet_name)
+        _write_sheet(ws, part, header)
+        _format_sheet(ws, part, header, bad)
+
     writer.close()
     return filename
@@ -1,49 +1,121 @@
 import os
-import json
 import asyncio
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from PIL import Image
-from bs4 import BeautifulSoup
-from .utils import get_session, get_raw_schema
+from bs4 import BeautifulSoup, SoupStrainer
+from .utils import get_shared_session, configure_gemini, get_raw_schema
 from .capturer import capture_screenshots
+from .cache import get_llm_result, store_llm_result
 
-def generate_improved_schema(url: str, api_key: str):
+# Page fetches that overlap with the screenshot capture
+_SCHEMA_FETCHER = ThreadPoolExecutor(max_workers=4, thread_name_prefix="schema-fetch")
+
+# Types that describe what the page actually is, beyond site-wide boilerplate
+SPECIFIC_SCHEMA_TYPES = {
+    "Article", "BlogPosting", "NewsArticle", "Product", "Offer", "LocalBusiness", "Service",
+    "FAQPage", "HowTo", "Event", "Recipe", "Review", "AggregateRating", "BreadcrumbList", "Person",
+}
+SCHEMA_CORE_FIELDS = ("name", "url", "description", "image")
+
+# Only JSON-LD blocks are read from the page, so nothing else is built into the tree
+JSON_LD_ONLY = SoupStrainer("script", attrs={"type": "application/ld+json"})
+
+def fetch_current_schema(url):
+    """Returns (old_schema_str, error); error is None when the page was read."""
+    try:
+        session = get_shared_session()
+        response = session.get(url, timeout=10)
+        if response.status_code >= 400:
+            return "", f"Error: Failed to fetch page. Status code {response.status_code}"
+
+        soup = BeautifulSoup(response.text, "lxml", parse_only=JSON_LD_ONLY)
+        return get_raw_schema(soup), None
+    except Exception as e:
+        return "", f"Error fetching current schema: {str(e)}"
+
+def score_existing_schema(schema_str):
+    """
+    Heuristic 0-10 completeness score for a page's JSON-LD. It is not the model's score:
+    it only checks structure (schema.org context, a page-specific type, filled core fields),
+    never whether the values are right. Used to skip the LLM for pages that look complete.
+    """
+    try:
+        data = orjson.loads(schema_str or "[]")
+    except ValueError:
+        return 0
+
+    # Flatten top-level entries and @graph members into typed nodes
+    nodes = []
+    stack = data if isinstance(data, list) else [data]
+    has_context = False
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            has_context = has_context or "schema.org" in str(item.get("@context", ""))
+            if "@type" in item:
+                nodes.append(item)
+            stack.extend(item.get("@graph", []))
+    if not nodes:
+        return 0
+
+    types = set()
+    for node in nodes:
+        t = node["@type"]
+        types.update(t if isinstance(t, list) else [t])
+
+    score = 2 + (2 if has_context else 0)
+    if types & SPECIFIC_SCHEMA_TYPES:
+        score += 2
+    # Best-filled node counts, so a thin Organization block does not drag down a full Product
+    score += max(sum(1 for field in SCHEMA_CORE_FIELDS if node.get(field)) for node in nodes)
+    return score
+
+def generate_improved_schema(url: str, api_key: str, force: bool = False, old_schema: str = None):
     """
     Coordinates process: fetch, screenshot, analyze with Gemini.
+    Successful results are reused for repeat calls on the same URL unless force is set.
+    old_schema skips the page fetch when the caller has already read the current schema.
     Returns:
         tuple: (old_schema_str, new_schema_str, old_score, new_score, summary)
     """
     if not api_key:
         return "Error: Gemini API Key is required.", "", 0, 0, ""
 
+    if not force:
+        cached = get_llm_result("schema", url, api_key)
+        if cached is not None:
+            return cached
+
     # Configure Gemini
-    genai.configure(api_key=api_key)
+    configure_gemini(api_key)
     model = genai.GenerativeModel('gemini-2.5-flash') 
 
-    # 1. Fetch Current Schema
-    try:
-        session = get_session()
-        response = session.get(url, timeout=10)
-        if response.status_code >= 400:
-             return f"Error: Failed to fetch page. Status code {response.status_code}", "", 0, 0, ""
-
-        soup = BeautifulSoup(response.text, "lxml")
-        old_schema = get_raw_schema(soup)
-    except Exception as e:
-        return f"Error fetching current schema: {str(e)}", "", 0, 0, ""
+    # 1. Fetch Current Schema, on a worker thread while the screenshot loads
+    fetch = None if old_schema is not None else _SCHEMA_FETCHER.submit(fetch_current_schema, url)
 
     # 2. Capture Screenshot
+    capture_error = ""
     try:
         # capture_screenshots is async and returns (folder_path, list_of_image_paths)
         # We need to run it synchronously here
-        _, screenshot_paths = asyncio.run(capture_screenshots([url]))
-
+        _, screenshot_paths = asyncio.run(capture_screenshots([url], use_cache=not force))
         if not screenshot_paths:
-            return old_schema, "Error: Failed to capture screenshot.", 0, 0, ""
-
-        screenshot_path = screenshot_paths[0]
+            capture_error = "Error: Failed to capture screenshot."
     except Exception as e:
-        return old_schema, f"Error capturing screenshot: {str(e)}", 0, 0, ""
+        capture_error = f"Error capturing screenshot: {str(e)}"
+
+    # A failed fetch is reported ahead of a failed capture
+    if fetch is not None:
+        old_schema, error = fetch.result()
+        if error:
+            return error, "", 0, 0, ""
+    if capture_error:
+        return old_schema, capture_error, 0, 0, ""
+    screenshot_path = screenshot_paths[0]
 
     # 3. Generate New Schema with Gemini (asking for JSON output)
     prompt = """
@@ -88,15 +160,17 @@ def generate_improved_schema(url: str, api_key: str):
             text_response = text_response[:-3]
 
         # Parse JSON
-        data = json.loads(text_response.strip())
+        data = orjson.loads(text_response.strip())
 
         new_schema_obj = data.get("new_schema", {})
-        new_schema_str = json.dumps(new_schema_obj, indent=2)
+        new_schema_str = orjson.dumps(new_schema_obj, option=orjson.OPT_INDENT_2).decode()
         old_score = data.get("old_score", 0)
         new_score = data.get("new_score", 0)
         summary = data.get("improvement_summary", "Schema generated.")
 
-        return old_schema, new_schema_str, old_score, new_score, summary
+        result = (old_schema, new_schema_str, old_score, new_score, summary)
+        store_llm_result("schema", url, api_key, result)
+        return result
 
     except Exception as e:
         # Fallback in case of JSON parse error or API error
@@ -1,22 +1,26 @@
 import gradio as gr
 import pandas as pd
-import time
-import json
+import orjson
+import os
 import asyncio
-from urllib.parse import urlparse, urljoin
+import ipaddress
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 
 # ==========================================
 # 📦 LOCAL IMPORTS
 # ==========================================
 try:
-    from .config import MAX_PAGES_TO_SCAN
-    from .crawler import check_robots_txt, fetch_sitemap_urls
-    from .analyzer import analyze_page, fetch_pages_async
-    from .reporter import prepare_dataframe, save_excel
-    from .capturer import capture_screenshots, create_zip, create_pdf
-    from .schema_gen import generate_improved_schema
-    from .wp_handler import push_schema_to_wordpress, update_page_meta
-    from .meta_gen import generate_meta_tags
+    from .config import MAX_PAGES_TO_SCAN, MAX_AUDIT_WORKERS, MAX_AUDIT_WORKERS_LIMIT, CAPTURE_CONCURRENCY, CAPTURE_CONCURRENCY_LIMIT
+    from .cache import get_sitemap, get_robots
+    from .analyzer import analyze_page
+    from .utils import get_shared_session, file_stamp, dedupe_urls, normalize_url
+    from .reporter import build_audit_frame, prepare_dataframe, save_excel
+    from .capturer import capture_screenshots, create_pdf, PdfPageEncoder, SCREENSHOT_ROOT
+    from .schema_gen import generate_improved_schema, fetch_current_schema, score_existing_schema
+    from .wp_handler import push_schema_to_wordpress, iter_meta_updates
+    from .meta_gen import iter_meta_tags
     from .image_alt_updater import fetch_page_images, update_image_alts
 except ImportError as e:
     print(f"Import Error: {e}")
@@ -26,47 +30,102 @@ except ImportError as e:
 # 🧠 LOGIC HANDLERS
 # ==========================================
 
-def run_audit_ui(urls_input, max_pages, progress=gr.Progress()):
+def _normalize_urls(raw: str) -> list[str]:
+    """Splits a comma-separated input, strips entries and adds https:// where missing."""
+    return [normalize_url(u) for u in (part.strip() for part in raw.split(',')) if u]
+
+def _is_local_host(url):
+    """True for localhost and literal IP addresses."""
+    host = urlparse(url).hostname or ""
+    if host == "localhost" or host.endswith(".localhost"):
+        return True
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+# Number of completed pages between intermediate table refreshes
+AUDIT_STREAM_EVERY = 5
+# Final status line of the audit tab
+AUDIT_SUMMARY_TEMPLATE = "✅ Audit Complete. Scanned {n} pages. HTTPS: {https}. Robots.txt: {robots}"
+ROBOTS_STATUS = {True: "✅ Found", False: "❌ Not Found", None: "⏭️ Skipped (local host)"}
+# Rows sent to the browser per page of the audit table
+AUDIT_PAGE_SIZE = 50
+
+def _audit_page(df, page):
+    """Returns one page of the full audit frame for display."""
+    if df is None:
+        return None
+    page = max(1, int(page or 1))
+    return df.iloc[(page - 1) * AUDIT_PAGE_SIZE:page * AUDIT_PAGE_SIZE]
+
+def _audit_outputs(df, filename, status):
+    """(visible page, report file, status, full frame for paging, page number reset)"""
+    return _audit_page(df, 1), filename, status, df, 1
+
+def _audit_progress_outputs(results, status, first):
+    """
+    Intermediate audit update. Only the rows visible on the first page are built, and the
+    paging state is left alone after the first update; the full frame is sent once at the end.
+    """
+    head = prepare_dataframe(build_audit_frame(results[:AUDIT_PAGE_SIZE]))
+    if first:
+        return head, None, status, None, 1
+    return head, gr.skip(), status, gr.skip(), gr.skip()
+
+def run_audit_ui(urls_input, max_pages, max_workers=MAX_AUDIT_WORKERS, crawl_sitemap=True, fresh=False, progress=gr.Progress()):
     if not urls_input:
-        return None, None, "Please enter URL(s)."
+        yield _audit_outputs(None, None, "Please enter URL(s).")
+        return
     
-    urls_list = [u.strip() for u in urls_input.split(',') if u.strip()]
+    urls_list = _normalize_urls(urls_input)
+    if not urls_list:
+        yield _audit_outputs(None, None, "Please enter URL(s).")
+        return
     
-    for i, url in enumerate(urls_list):
-        if not url.startswith("http"):
-            urls_list[i] = "https://" + url
-    
-    if len(urls_list) == 1:
+    if len(urls_list) == 1 and (max_pages == 1 or not crawl_sitemap):
+        # The start page is always scanned first, so a one-page audit never needs the sitemap
+        urls_to_scan = urls_list
+        domain_netloc = urlparse(urls_list[0]).netloc
+    elif len(urls_list) == 1:
         start_url = urls_list[0]
         domain_netloc = urlparse(start_url).netloc
         progress(0.1, desc="🔍 Discovering pages...")
-        sitemap_url = urljoin(start_url, "sitemap.xml")
-        found_sitemap = fetch_sitemap_urls(sitemap_url)
-        if found_sitemap:
-            urls_to_scan = list(found_sitemap)
-        else:
-            urls_to_scan = urls_list
+        # Start page first, then sitemap order; fragment/slash/case variants of a page are scanned once.
+        # The sitemap is deduplicated before its limit, so max_pages distinct pages are still found.
+        sitemap_limit = int(max_pages) if max_pages and max_pages > 0 else None
+        urls_to_scan = dedupe_urls(chain([start_url], get_sitemap(start_url, limit=sitemap_limit, fresh=fresh)))
     else:
-        urls_to_scan = urls_list
+        urls_to_scan = dedupe_urls(urls_list)
         domain_netloc = urlparse(urls_to_scan[0]).netloc
+
+    # Local dev servers rarely serve robots.txt; don't spend a round trip on them
+    robots_ok = None if _is_local_host(urls_list[0]) else get_robots(urls_list[0], fresh=fresh)
     
+    # Keep sitemap order; only the first max_pages entries are taken
     if max_pages > 0:
-        urls_to_scan = urls_to_scan[:int(max_pages)]
+        urls_to_scan = list(islice(urls_to_scan, int(max_pages)))
+    else:
+        urls_to_scan = list(urls_to_scan)
+
+    if not urls_to_scan:
+        yield _audit_outputs(None, None, "⚠️ No pages discovered. Check the URL, sitemap and robots.txt.")
+        return
         
     results = []
 
-    # Use ThreadPoolExecutor with INCREASED concurrency
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
-    # Massively increased workers since HTTP I/O is non-blocking
-    # Can handle 100+ concurrent requests depending on target server
-    max_workers = min(100, len(urls_to_scan)) if len(urls_to_scan) > 0 else 1
+    # Fetches overlap on the network; each page also fans out its own link checks,
+    # so page-level concurrency is capped to avoid hammering the target host
+    max_workers = max(1, min(int(max_workers or MAX_AUDIT_WORKERS), MAX_AUDIT_WORKERS_LIMIT, len(urls_to_scan)))
+    session = get_shared_session()
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_url = {executor.submit(analyze_page, url, domain_netloc): url for url in urls_to_scan}
+        future_to_url = {executor.submit(analyze_page, url, domain_netloc, session): url for url in urls_to_scan}
 
         completed_count = 0
         total_urls = len(urls_to_scan)
+        streamed = False
 
         for future in as_completed(future_to_url):
             completed_count += 1
@@ -78,17 +137,34 @@ def run_audit_ui(urls_input, max_pages, progress=gr.Progress()):
             except Exception as e:
                 print(f"Error analyzing {url}: {e}")
                 pass
+
+            # Stream partial results so the table fills while the scan runs.
+            # The first finished page is shown immediately, then every AUDIT_STREAM_EVERY pages.
+            refresh = completed_count == 1 or completed_count % AUDIT_STREAM_EVERY == 0
+            if refresh and completed_count < total_urls and results:
+                yield _audit_progress_outputs(results, f"⏳ Scanning... {completed_count}/{total_urls} pages analyzed.", not streamed)
+                streamed = True
         
-    df = pd.DataFrame(results)
+    df = build_audit_frame(results)
     df_display = prepare_dataframe(df)
+
+    # Show the finished table before the (slower) Excel serialization starts
+    yield _audit_outputs(df_display, None, f"📝 Scanned {len(urls_to_scan)} pages. Preparing Excel report...")
     
-    timestamp = int(time.time())
-    filename = f"audit_report_{timestamp}.xlsx"
+    filename = f"audit_report_{file_stamp()}.xlsx"
     save_excel(df_display, filename)
     
-    return df_display, filename, f"✅ Audit Complete. Scanned {len(urls_to_scan)} pages."
+    https_ok = "https_ok" in df_display.columns and df_display["https_ok"].to_numpy().all()
+    yield _audit_outputs(df_display, filename, AUDIT_SUMMARY_TEMPLATE.format(
+        n=len(urls_to_scan),
+        https="✅ Secure" if https_ok else "❌ Insecure pages found",
+        robots=ROBOTS_STATUS[robots_ok],
+    ))
+
+# Screenshots shown in the capture gallery; the rest are only in the PDF
+GALLERY_PREVIEW_LIMIT = 10
 
-def run_capture_ui(urls_input, progress=gr.Progress(track_tqdm=True)):
+def run_capture_ui(urls_input, max_concurrency=CAPTURE_CONCURRENCY, fresh=False, progress=gr.Progress(track_tqdm=True)):
     if not urls_input:
         return None, None, "Please enter URL(s)."
 
@@ -96,49 +172,64 @@ def run_capture_ui(urls_input, progress=gr.Progress(track_tqdm=True)):
     if 'capture_screenshots' not in globals() or 'create_pdf' not in globals():
         return None, None, "❌ Error: Required dependencies (Playwright/Pillow) are missing. Please install them."
     
-    urls_list = [u.strip() for u in urls_input.split(',') if u.strip()]
-    for i, url in enumerate(urls_list):
-        if not url.startswith("http"):
-            urls_list[i] = "https://" + url
+    urls_list = dedupe_urls(_normalize_urls(urls_input))
         
     progress(0.1, desc=f"📸 Initializing capture for {len(urls_list)} page(s)...")
 
+    # Screenshots start encoding for the PDF as soon as each one is saved
+    encoder = PdfPageEncoder(len(urls_list))
     try:
         # Run async capture in event loop - returns (folder_path, screenshot_paths)
-        folder_path, screenshot_paths = asyncio.run(capture_screenshots(urls_list, progress=progress))
+        folder_path, screenshot_paths = asyncio.run(capture_screenshots(
+            urls_list, progress=progress, on_capture=lambda idx, path: encoder.submit(path),
+            max_concurrency=min(int(max_concurrency or CAPTURE_CONCURRENCY), CAPTURE_CONCURRENCY_LIMIT),
+            use_cache=not fresh
+        ))
         
         if not screenshot_paths:
             return None, None, "❌ Failed to capture screenshots. Check if URLs are valid."
 
         progress(0.9, desc="📄 Creating PDF...")
-        pdf_filename = f"screenshots_{int(time.time())}.pdf"
+        pdf_filename = f"screenshots_{file_stamp()}.pdf"
 
         # Create PDF from the screenshot paths
-        pdf_path = create_pdf(screenshot_paths, pdf_filename)
+        pdf_path = create_pdf(screenshot_paths, pdf_filename, encoder=encoder)
+
+        # The gallery only previews the first few pages; every page is in the PDF
+        previews = [os.path.abspath(path) for path in screenshot_paths[:GALLERY_PREVIEW_LIMIT]]
 
         if not pdf_path:
-            return screenshot_paths, None, "⚠️ Captured screenshots but PDF creation failed."
+            return previews, None, "⚠️ Captured screenshots but PDF creation failed."
 
-        return screenshot_paths, pdf_path, f"✅ Capture Complete. {len(screenshot_paths)} page(s) captured and converted to PDF."
+        status = f"✅ Capture Complete. {len(screenshot_paths)} page(s) captured and converted to PDF."
+        if len(screenshot_paths) > GALLERY_PREVIEW_LIMIT:
+            status += f" Previewing the first {GALLERY_PREVIEW_LIMIT}."
+        return previews, pdf_path, status
     
     except Exception as e:
         import traceback
         traceback.print_exc()
         return None, None, f"❌ Error during capture: {str(e)}"
+    finally:
+        encoder.shutdown()
+
+# Auto-Fix leaves pages whose existing schema reaches this heuristic score (out of 10) alone,
+# unless Force is ticked; see score_existing_schema
+STRONG_SCHEMA_SCORE = 8
 
-def run_schema_update(urls_input, api_key, progress=gr.Progress()):
+def run_schema_update(urls_input, api_key, force=False, progress=gr.Progress()):
     if not urls_input:
         return "Please enter URL(s).", "", "", 0, 0
     if not api_key:
         return "Please enter a Gemini API Key.", "", "", 0, 0
 
-    urls_list = [u.strip() for u in urls_input.split(',') if u.strip()]
+    urls_list = _normalize_urls(urls_input)
+    if not urls_list:
+        return "Please enter URL(s).", "", "", 0, 0
     url = urls_list[0]
-    if not url.startswith("http"):
-        url = "https://" + url
 
     progress(0, desc="🚀 Initializing...")
-    old_schema, new_schema, old_score, new_score, summary = generate_improved_schema(url, api_key)
+    old_schema, new_schema, old_score, new_score, summary = generate_improved_schema(url, api_key, force=force)
 
     status_text = f"✅ Analysis Complete for {url}\nSummary: {summary}"
     if len(urls_list) > 1:
@@ -146,19 +237,30 @@ def run_schema_update(urls_input, api_key, progress=gr.Progress()):
 
     return status_text, old_schema, new_schema, old_score, new_score
 
+def _write_backup(filename, data):
+    with open(filename, "wb", buffering=0) as f:
+        f.write(data)
+
 def confirm_and_update(url, new_schema_content, wp_user, wp_pass):
     if not new_schema_content:
         return "Error: No schema content generated yet.", None
     if not wp_user or not wp_pass:
         return "Error: WordPress Username and App Password are required.", None
-    if not url.startswith("http"):
-        url = "https://" + url
+    urls_list = _normalize_urls(url or "")
+    if not urls_list:
+        return "Error: Please enter a page URL.", None
+    url = urls_list[0]
+
+    # Reject malformed JSON before it is backed up or pushed live
+    try:
+        orjson.loads(new_schema_content)
+    except ValueError as e:
+        return f"Error: Schema is not valid JSON: {e}", None
 
-    timestamp = int(time.time())
-    filename = f"backup_schema_{timestamp}.json"
+    # The backup is the restore point, so nothing is pushed unless it was written
+    filename = f"backup_schema_{file_stamp()}.json"
     try:
-        with open(filename, "w") as f:
-            f.write(new_schema_content)
+        _write_backup(filename, new_schema_content.encode("utf-8"))
     except Exception as e:
         return f"Error saving local backup: {e}", None
 
@@ -171,17 +273,31 @@ def confirm_and_update(url, new_schema_content, wp_user, wp_pass):
     
     return log_msg, filename
     
-def auto_fix_schema(urls_input, api_key, wp_user, wp_pass, progress=gr.Progress()):
+def auto_fix_schema(urls_input, api_key, wp_user, wp_pass, force=False, progress=gr.Progress()):
     if not urls_input or not api_key or not wp_user or not wp_pass:
         return "Error: All fields are required for Auto-Fix.", "", "", 0, 0
 
-    urls_list = [u.strip() for u in urls_input.split(',') if u.strip()]
+    urls_list = _normalize_urls(urls_input)
+    if not urls_list:
+        return "Error: All fields are required for Auto-Fix.", "", "", 0, 0
     url = urls_list[0]
-    if not url.startswith("http"):
-        url = "https://" + url
+
+    # Pages whose markup already looks complete never reach the LLM. The structural check
+    # cannot judge the values, so Force sends the page to the model anyway.
+    old_schema = None
+    if not force:
+        progress(0.05, desc="🔍 Checking existing schema...")
+        current_schema, error = fetch_current_schema(url)
+        if not error:
+            old_schema = current_schema
+            current_score = score_existing_schema(current_schema)
+            if current_score >= STRONG_SCHEMA_SCORE:
+                msg = (f"ℹ️ Existing schema for {url} looks complete (structural check {current_score}/10, "
+                       f"not an AI score). Skipped the AI review; tick 'Force' to have it reviewed anyway.")
+                return msg, current_schema, "", None, None
 
     progress(0.1, desc="🔍 Analyzing & Generating Schema...")
-    old_schema, new_schema_str, old_score, new_score, summary = generate_improved_schema(url, api_key)
+    old_schema, new_schema_str, old_score, new_score, summary = generate_improved_schema(url, api_key, force=force, old_schema=old_schema)
     
     if not new_schema_str or "Error" in summary:
         return f"❌ Generation Failed: {summary}", old_schema, "", old_score, new_score
@@ -204,70 +320,80 @@ def auto_fix_schema(urls_input, api_key, wp_user, wp_pass, progress=gr.Progress(
         msg = f"ℹ️ No improvement found for {url}. Old Score: {old_score}, New Score: {new_score}. No update performed."
         return msg, old_schema, new_schema_str, old_score, new_score
 
-def run_meta_gen(urls_text, api_key, progress=gr.Progress()):
+def run_meta_gen(urls_text, api_key, force=False, progress=gr.Progress()):
     if not urls_text or not api_key:
-        return pd.DataFrame(), "Please enter URLs and API Key."
+        yield pd.DataFrame(), "Please enter URLs and API Key."
+        return
         
-    urls = [u.strip() for u in urls_text.split(',') if u.strip()]
+    urls = _normalize_urls(urls_text)
     progress(0.1, desc="🧠 Generating Meta Tags...")
-    results = generate_meta_tags(urls, api_key)
-    df = pd.DataFrame(results)
-    return df, f"✅ Generated suggestions for {len(results)} pages."
+
+    # Rows fill in as each page finishes, but stay in the order the URLs were entered
+    results = [None] * len(urls)
+    for done, (i, row) in enumerate(iter_meta_tags(urls, api_key, force=force), start=1):
+        results[i] = row
+        progress(done / len(urls), desc=f"🧠 Generated {done}/{len(urls)}")
+        yield pd.DataFrame([r for r in results if r is not None]), f"⏳ {done}/{len(urls)} done"
+
+    results = [r for r in results if r is not None]
+    yield pd.DataFrame(results), f"✅ Generated suggestions for {len(results)} pages."
+
+# Concurrent WordPress meta updates
+META_UPDATE_WORKERS = 6
 
 def run_meta_update(df, wp_user, wp_pass, progress=gr.Progress()):
     if df is None or df.empty:
-        return "No data to update."
+        yield "No data to update."
+        return
     if not wp_user or not wp_pass:
-        return "Please enter WP Credentials."
+        yield "Please enter WP Credentials."
+        return
         
-    log = []
-    total = len(df)
-    for i, row in df.iterrows():
-        url = row['URL']
-        new_title = row['New Title']
-        new_desc = row['New Desc']
-        progress((i+1)/total, desc=f"Updating {url}...")
-        success, msg = update_page_meta(url, wp_user, wp_pass, new_title, new_desc)
+    # Plain tuples avoid building a Series per row
+    rows = list(zip(df['URL'].values, df['New Title'].values, df['New Desc'].values))
+    total = len(rows)
+    log = [None] * total
+
+    # Lookups run on a small pool (within WP rate limits); the writes themselves go out
+    # through the REST batch endpoint where the site supports it
+    updates = iter_meta_updates(rows, wp_user, wp_pass, max_workers=META_UPDATE_WORKERS)
+    for done, (i, success, msg) in enumerate(updates, start=1):
         status = "✅" if success else "❌"
-        log.append(f"{status} {url}: {msg}")
-    return "\n".join(log)
+        log[i] = f"{status} {rows[i][0]}: {msg}"
+
+        # Stream the log (in row order) alongside the progress bar
+        if done % 5 == 0 or done == total:
+            progress(done / total, desc=f"Updated {done}/{total} pages...")
+            yield "\n".join(line for line in log if line is not None)
 
 def run_sitemap_extract(homepage_url, progress=gr.Progress()):
     if not homepage_url:
-        return None, "Please enter a homepage URL.", None
-    if not homepage_url.startswith("http"):
-        homepage_url = "https://" + homepage_url
+        return "Please enter a homepage URL.", None
+    urls_list = _normalize_urls(homepage_url)
+    if not urls_list:
+        return "Please enter a homepage URL.", None
+    homepage_url = urls_list[0]
     
     progress(0.1, desc="🔍 Looking for sitemap...")
-    sitemap_url = urljoin(homepage_url, "sitemap.xml")
-    
-    progress(0.3, desc=f"📥 Fetching from {sitemap_url}...")
-    urls = fetch_sitemap_urls(sitemap_url)
+    urls = get_sitemap(homepage_url)
     
     if not urls:
-        sitemap_url = urljoin(homepage_url, "sitemap_index.xml")
-        progress(0.5, desc=f"📥 Trying {sitemap_url}...")
-        urls = fetch_sitemap_urls(sitemap_url)
-    
-    if not urls:
-        return None, f"❌ No URLs found. Tried {sitemap_url}", None
+        return "❌ No URLs found. Tried sitemap.xml and sitemap_index.xml", None
     
     progress(0.9, desc="📋 Preparing results...")
-    df = pd.DataFrame({"URL": sorted(list(urls))})
+    df = pd.DataFrame({"URL": list(urls)})
     
-    timestamp = int(time.time())
-    filename = f"sitemap_urls_{timestamp}.csv"
+    filename = f"sitemap_urls_{file_stamp()}.csv"
     df.to_csv(filename, index=False)
     
-    return df, f"✅ Found {len(urls)} URLs", filename
+    return f"✅ Found {len(urls)} URLs", filename
 
 def run_image_alt_fetch(page_url, wp_user, wp_pass, progress=gr.Progress()):
     """Fetch all images from a page and return them in a format suitable for the UI"""
     if not page_url:
         return [], "Please enter a page URL."
     
-    if not page_url.startswith("http"):
-        page_url = "https://" + page_url
+    page_url = normalize_url(page_url.strip())
     
     progress(0.3, desc="🖼️ Fetching images...")
     
@@ -305,17 +431,15 @@ def run_image_alt_update(page_url, image_df, wp_user, wp_pass, progress=gr.Progr
 
     # Check if input is a pandas DataFrame
     if isinstance(image_df, pd.DataFrame):
-        for index, row in image_df.iterrows():
-            # Access by column name
-            try:
-                attachment_id = row['Attachment ID']
-                new_alt = row['New Alt Text']
-            except KeyError:
-                # Fallback to indices if column names mismatch
-                # Order: Preview, URL, Current, New, ID
-                attachment_id = row.iloc[4]
-                new_alt = row.iloc[3]
+        # Pull the two columns once instead of building a Series per row
+        if 'Attachment ID' in image_df.columns and 'New Alt Text' in image_df.columns:
+            pairs = zip(image_df['Attachment ID'].tolist(), image_df['New Alt Text'].tolist())
+        else:
+            # Fallback to indices if column names mismatch
+            # Order: Preview, URL, Current, New, ID
+            pairs = zip(image_df.iloc[:, 4].tolist(), image_df.iloc[:, 3].tolist())
 
+        for attachment_id, new_alt in pairs:
             # Skip if no attachment ID
             if attachment_id == "N/A" or not attachment_id or pd.isna(attachment_id):
                 continue
@@ -370,6 +494,7 @@ h1, h2, h3 { font-family: 'Inter', sans-serif; }
 #main_content { background-color: transparent; padding-left: 20px; }
 .primary-btn { background: linear-gradient(135deg, #6366f1 0%, #4f46e5 100%) !important; border: none; color: white !important; }
 .card { background: white; padding: 20px; border-radius: 12px; border: 1px solid #e2e8f0; margin-bottom: 20px; }
+.spacer { margin-top: 15px; }
 """
 
 theme = gr.themes.Soft(
@@ -379,7 +504,17 @@ theme = gr.themes.Soft(
     radius_size=gr.themes.sizes.radius_md,
 )
 
+# Independent sessions run side by side; crawls, browsers and LLM calls get a tighter per-event cap
+QUEUE_CONCURRENCY = 8
+QUEUE_MAX_SIZE = 64
+HEAVY_CONCURRENCY = 4
+
 def create_ui():
+    # Screenshots are served straight from disk instead of being copied into Gradio's cache
+    if 'SCREENSHOT_ROOT' in globals():
+        os.makedirs(SCREENSHOT_ROOT, exist_ok=True)
+        gr.set_static_paths(paths=[SCREENSHOT_ROOT])
+
     with gr.Blocks(title="SEO Command Center", theme=theme, css=custom_css) as demo:
         
         # Application Header
@@ -407,7 +542,7 @@ def create_ui():
                         info="Required for Schema & Meta Gen"
                     )
                     
-                    gr.HTML("<div style='margin-top: 15px;'></div>")
+                    gr.HTML("<div class='spacer'></div>")
                     
                     wp_user_input = gr.Textbox(
                         label="WordPress Username", 
@@ -439,12 +574,13 @@ def create_ui():
             # ==========================
             with gr.Column(scale=4, elem_id="main_content"):
                 
-                with gr.Tabs(elem_classes="main_tabs"):
+                # Only the Audit tab mounts on first paint; the others mount when first opened
+                with gr.Tabs(elem_classes="main_tabs", selected="audit"):
                     
                     # ------------------------
                     # TAB 1: AUDIT
                     # ------------------------
-                    with gr.Tab("🔍 Audit & Crawl"):
+                    with gr.Tab("🔍 Audit & Crawl", id="audit"):
                         with gr.Group(elem_classes="card"):
                             gr.Markdown("### 🕷️ Site Crawler")
                             with gr.Row():
@@ -459,6 +595,17 @@ def create_ui():
                                     precision=0, 
                                     scale=1
                                 )
+                                max_workers_input = gr.Number(
+                                    label="Parallel Requests", 
+                                    value=MAX_AUDIT_WORKERS, 
+                                    precision=0, 
+                                    minimum=1,
+                                    maximum=MAX_AUDIT_WORKERS_LIMIT,
+                                    scale=1
+                                )
+                            with gr.Row():
+                                crawl_sitemap_input = gr.Checkbox(label="Crawl sitemap (untick to audit only the entered URL)", value=True)
+                                fresh_crawl_input = gr.Checkbox(label="Re-fetch sitemap and robots.txt (ignore cache)", value=False)
                             audit_btn = gr.Button("Start Audit", variant="primary", elem_classes="primary-btn")
                         
                         with gr.Group():
@@ -466,18 +613,30 @@ def create_ui():
                             with gr.Accordion("📊 Audit Results", open=True):
                                 # FIXED: Removed height param
                                 audit_df = gr.Dataframe(interactive=False)
+                                audit_page = gr.Number(label=f"Page ({AUDIT_PAGE_SIZE} rows each)", value=1, precision=0, minimum=1)
                                 audit_download = gr.File(label="Download Report (.xlsx)")
 
+                        # Full results stay server-side; only the visible page is sent to the browser
+                        audit_state = gr.State()
+
                         audit_btn.click(
                             run_audit_ui,
-                            inputs=[url_input_audit, max_pages_input],
-                            outputs=[audit_df, audit_download, audit_status]
+                            inputs=[url_input_audit, max_pages_input, max_workers_input, crawl_sitemap_input, fresh_crawl_input],
+                            outputs=[audit_df, audit_download, audit_status, audit_state, audit_page],
+                            concurrency_limit=HEAVY_CONCURRENCY
+                        )
+                        # Paging only slices the stored frame, so it never waits behind a crawl
+                        audit_page.change(
+                            _audit_page,
+                            inputs=[audit_state, audit_page],
+                            outputs=[audit_df],
+                            concurrency_limit=None
                         )
 
                     # ------------------------
                     # TAB 2: SCHEMA
                     # ------------------------
-                    with gr.Tab("🧠 Schema AI"):
+                    with gr.Tab("🧠 Schema AI", id="schema", render_children=False):
                         with gr.Group(elem_classes="card"):
                             gr.Markdown("### 🧬 JSON-LD Generator & Fixer")
                             url_input_schema = gr.Textbox(
@@ -487,6 +646,11 @@ def create_ui():
                             with gr.Row():
                                 generate_schema_btn = gr.Button("Analyze & Generate", variant="secondary")
                                 auto_fix_btn = gr.Button("⚡ Auto-Fix & Push Live", variant="primary", elem_classes="primary-btn")
+                            force_schema_input = gr.Checkbox(
+                                label="Force regenerate (ignore cached result)",
+                                info="Auto-Fix skips pages whose existing schema already looks complete; tick this to review them anyway.",
+                                value=False
+                            )
                         
                         schema_status = gr.Markdown("")
                         
@@ -495,7 +659,8 @@ def create_ui():
                             with gr.Column():
                                 gr.Label("Current Status", color="grey")
                                 old_score_disp = gr.Number(label="SEO Score", interactive=False)
-                                old_schema_display = gr.Code(language="json", label="Existing Schema", interactive=False, lines=15)
+                                # Read-only view: a plain Textbox avoids the code editor's highlighting on large blobs
+                                old_schema_display = gr.Textbox(label="Existing Schema", interactive=False, lines=15, max_lines=15, show_copy_button=True)
                             
                             with gr.Column():
                                 gr.Label("AI Recommendation", color="green")
@@ -511,26 +676,34 @@ def create_ui():
                             update_log = gr.Textbox(label="Transaction Logs", interactive=False, lines=10, show_copy_button=True)
 
                         # Connect Logic
+                        # The JSON editor is only read on explicit clicks (no .change listeners).
+                        # Clicks keep the default trigger_mode="once" so a double click cannot
+                        # start a second LLM call or WordPress push while one is running.
                         generate_schema_btn.click(
                             run_schema_update,
-                            inputs=[url_input_schema, api_key_input],
-                            outputs=[schema_status, old_schema_display, new_schema_display, old_score_disp, new_score_disp]
+                            inputs=[url_input_schema, api_key_input, force_schema_input],
+                            outputs=[schema_status, old_schema_display, new_schema_display, old_score_disp, new_score_disp],
+                            show_progress="minimal",
+                            concurrency_limit=HEAVY_CONCURRENCY
                         )
                         auto_fix_btn.click(
                             auto_fix_schema,
-                            inputs=[url_input_schema, api_key_input, wp_user_input, wp_pass_input],
-                            outputs=[schema_status, old_schema_display, new_schema_display, old_score_disp, new_score_disp]
+                            inputs=[url_input_schema, api_key_input, wp_user_input, wp_pass_input, force_schema_input],
+                            outputs=[schema_status, old_schema_display, new_schema_display, old_score_disp, new_score_disp],
+                            show_progress="minimal",
+                            concurrency_limit=HEAVY_CONCURRENCY
                         )
                         save_schema_btn.click(
                             confirm_and_update,
                             inputs=[url_input_schema, new_schema_display, wp_user_input, wp_pass_input],
-                            outputs=[update_log, download_schema_file]
+                            outputs=[update_log, download_schema_file],
+                            show_progress="minimal"
                         )
 
                     # ------------------------
                     # TAB 3: META TAGS
                     # ------------------------
-                    with gr.Tab("🏷️ Meta Tags"):
+                    with gr.Tab("🏷️ Meta Tags", id="meta", render_children=False):
                         with gr.Group(elem_classes="card"):
                             gr.Markdown("### 🤖 Bulk Meta Tag Optimizer")
                             meta_urls_input = gr.Textbox(
@@ -538,6 +711,7 @@ def create_ui():
                                 placeholder="https://site.com/a, https://site.com/b",
                                 lines=2
                             )
+                            force_meta_input = gr.Checkbox(label="Force regenerate (ignore cached results)", value=False)
                             meta_gen_btn = gr.Button("Generate Suggestions", variant="primary", elem_classes="primary-btn")
 
                         meta_status = gr.Markdown()
@@ -555,29 +729,32 @@ def create_ui():
                             # FIXED: Changed from gr.Code(language="text") to gr.Textbox
                             meta_log = gr.Textbox(label="Update Log", interactive=False, lines=5, show_copy_button=True)
 
-                        meta_gen_btn.click(run_meta_gen, inputs=[meta_urls_input, api_key_input], outputs=[meta_df, meta_status])
+                        meta_gen_btn.click(run_meta_gen, inputs=[meta_urls_input, api_key_input, force_meta_input], outputs=[meta_df, meta_status], concurrency_limit=HEAVY_CONCURRENCY)
                         meta_update_btn.click(run_meta_update, inputs=[meta_df, wp_user_input, wp_pass_input], outputs=[meta_log])
 
                     # ------------------------
                     # TAB 4: UTILITIES
                     # ------------------------
-                    with gr.Tab("🛠️ Utilities"):
+                    with gr.Tab("🛠️ Utilities", id="utilities", render_children=False):
                         with gr.Row():
                             # Capture Tool
                             with gr.Column():
                                 with gr.Group(elem_classes="card"):
                                     gr.Markdown("### 📸 Visual Capture")
                                     url_input_capture = gr.Textbox(label="URLs", placeholder="https://example.com")
+                                    capture_concurrency_input = gr.Slider(1, CAPTURE_CONCURRENCY_LIMIT, value=CAPTURE_CONCURRENCY, step=1, label="Pages Captured at Once")
+                                    fresh_capture_input = gr.Checkbox(label="Fresh capture (ignore screenshots from the last day)", value=False)
                                     capture_btn = gr.Button("Capture & PDF", variant="secondary")
                                     
                                     capture_status = gr.Markdown("")
                                     pdf_download = gr.File(label="Download PDF")
-                                    gallery = gr.Gallery(label="Previews", height=200, columns=2)
+                                    gallery = gr.Gallery(label="Previews", height=200, columns=2, type="filepath")
                                     
                                     capture_btn.click(
                                         run_capture_ui,
-                                        inputs=[url_input_capture],
-                                        outputs=[gallery, pdf_download, capture_status]
+                                        inputs=[url_input_capture, capture_concurrency_input, fresh_capture_input],
+                                        outputs=[gallery, pdf_download, capture_status],
+                                        concurrency_limit=HEAVY_CONCURRENCY
                                     )
                             
                             # Sitemap Tool
@@ -593,7 +770,7 @@ def create_ui():
                                     sitemap_extract_btn.click(
                                         run_sitemap_extract,
                                         inputs=[sitemap_url_input],
-                                        outputs=[gr.Dataframe(visible=False), sitemap_status, sitemap_download]
+                                        outputs=[sitemap_status, sitemap_download]
                                     )
                         
                         # Image Alt Text Updater
@@ -625,7 +802,7 @@ def create_ui():
                                 update_alts_btn = gr.Button("🚀 Update All Alt Texts", variant="stop")
                                 
                                 # FIXED: CHANGED FROM gr.Code(..., language="text") TO gr.Textbox
-                                update_log = gr.Textbox(
+                                alt_update_log = gr.Textbox(
                                     label="Update Log", 
                                     lines=6, 
                                     interactive=False, 
@@ -642,7 +819,8 @@ def create_ui():
                             update_alts_btn.click(
                                 run_image_alt_update,
                                 inputs=[image_page_url, image_df, wp_user_input, wp_pass_input],
-                                outputs=[update_log]
+                                outputs=[alt_update_log]
                             )
 
+    demo.queue(default_concurrency_limit=QUEUE_CONCURRENCY, max_size=QUEUE_MAX_SIZE, api_open=False)
     return demo
@@ -1,44 +1,116 @@
 import json
+import orjson
+import re
+import time
+import threading
 import requests
-from .config import USER_AGENT
+from urllib.parse import urlparse, urlunparse
+from urllib3.util.retry import Retry
+from .config import USER_AGENT, URL_SCHEMES
 
 def get_session():
     """Returns a configured requests Session."""
     session = requests.Session()
-    # Increase connection pool size to handle concurrency
-    adapter = requests.adapters.HTTPAdapter(pool_connections=100, pool_maxsize=100)
+    # Increase connection pool size to handle concurrency.
+    # Retries cover transient connection resets and rate-limit/gateway errors without
+    # failing the whole page; the last response is returned rather than raised.
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=100,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=[429, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    )
     session.mount("http://", adapter)
     session.mount("https://", adapter)
-    session.headers.update({"User-Agent": USER_AGENT})
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+    })
     return session
 
-def get_schema_types(soup):
-    """Recursively extracts all @type values from JSON-LD."""
-    types_found = set()
-    scripts = soup.find_all('script', type='application/ld+json')
+# Process-wide session so every module shares one keep-alive connection pool
+_SESSION = get_session()
 
-    def extract_recursive(data):
-        if isinstance(data, dict):
-            if "@type" in data:
-                t = data["@type"]
-                if isinstance(t, list):
-                    types_found.update(t)
-                else:
-                    types_found.add(t)
-            for key, value in data.items():
-                extract_recursive(value)
-        elif isinstance(data, list):
-            for item in data:
-                extract_recursive(item)
+def get_shared_session():
+    """Returns the process-wide pooled Session."""
+    return _SESSION
 
-    for script in scripts:
+_gemini_key = None
+_gemini_lock = threading.Lock()
+
+def configure_gemini(api_key):
+    """
+    Configures the Gemini SDK, but only when the key changes.
+    Every genai.configure() call discards the SDK's cached client and its open connections.
+    """
+    global _gemini_key
+    import google.generativeai as genai
+    with _gemini_lock:
+        if api_key != _gemini_key:
+            genai.configure(api_key=api_key)
+            _gemini_key = api_key
+
+def normalize_url(url):
+    """Adds https:// to URLs entered without an http(s) scheme."""
+    return url if url.startswith(URL_SCHEMES) else "https://" + url
+
+def canonical_url_key(url):
+    """
+    Comparison key for URLs that point at the same page: lowercase scheme and host,
+    no fragment, and no repeated or trailing slashes in the path.
+    """
+    parsed = urlparse(url)
+    path = re.sub(r"/{2,}", "/", parsed.path).rstrip("/")
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, parsed.params, parsed.query, ""))
+
+def iter_unique_urls(urls):
+    """Lazily yields URLs whose canonical key was not seen before, keeping the first spelling and the order."""
+    seen = set()
+    for url in urls:
+        key = canonical_url_key(url)
+        if key not in seen:
+            seen.add(key)
+            yield url
+
+def dedupe_urls(urls):
+    """Drops URLs whose canonical key was already seen, keeping the first spelling and the order."""
+    return list(iter_unique_urls(urls))
+
+def file_stamp():
+    """Returns a short, nanosecond-resolution hex stamp for output filenames."""
+    # Whole seconds collided on rapid repeat clicks and silently overwrote reports
+    return format(time.time_ns(), "x")
+
+def get_schema_types(soup):
+    """Extracts all @type values from JSON-LD, walking nested objects with an explicit stack."""
+    types_found = set()
+    stack = []
+    for script in soup.find_all('script', type='application/ld+json'):
         if script.string:
             try:
-                data = json.loads(script.string)
-                extract_recursive(data)
-            except:
+                # bs4 hands back a str subclass, which orjson rejects
+                stack.append(orjson.loads(str(script.string)))
+            except ValueError:
                 continue
-    return ", ".join(sorted(list(types_found)))
+
+    while stack:
+        node = stack.pop()
+        kind = type(node)
+        if kind is dict:
+            t = node.get("@type")
+            if type(t) is str:
+                types_found.add(t)
+            elif type(t) is list:
+                types_found.update(x for x in t if type(x) is str)
+            stack.extend(node.values())
+        elif kind is list:
+            stack.extend(node)
+
+    return ", ".join(sorted(types_found))
 
 def get_raw_schema(soup):
     """
@@ -1,68 +1,163 @@
-import requests
-import json
+import base64
+import threading
+import time
+from functools import lru_cache
+import orjson
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def push_schema_to_wordpress(target_url, username, app_password, schema_json_str):
+from .utils import get_session
+from .cache import _ttl_cache
+
+# Sent with every update POST, alongside the auth header
+WP_HEADERS = {"Content-Type": "application/json", "User-Agent": "Gemini-SEO-Updater/1.0"}
+
+# /wp-json/batch/v1 accepts at most 25 sub-requests per call (WordPress 5.6+)
+WP_BATCH_SIZE = 25
+
+_WP_SESSION = None
+_wp_session_lock = threading.Lock()
+
+def get_wp_session():
     """
-    1. Derives slug from URL.
-    2. Searches WP API for the Page/Post ID.
-    3. Updates the 'custom_schema_json' meta field.
+    Returns the Session used for every WordPress REST call.
+    It keeps its own keep-alive pool, separate from the audit crawler's, and retries
+    gateway errors and 500s with backoff; the last response is returned rather than raised.
+    POSTs are only retried when the connection could not be made: a server error may come
+    after part of an update (or of a /batch/v1 call) was already applied.
+    """
+    global _WP_SESSION
+    with _wp_session_lock:
+        if _WP_SESSION is None:
+            session = get_session()
+            # Bulk updates run ID lookups and updates side by side against one host;
+            # room for both keeps them from opening throwaway connections
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    raise_on_status=False,
+                ),
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _WP_SESSION = session
+    return _WP_SESSION
+
+def wp_auth_header(username, app_password):
+    """Basic-auth header for an application password; built per call so credentials are never cached."""
+    token = base64.b64encode(f"{username}:{app_password}".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
+
+# The same URLs are split again for every lookup, cache key and batch grouping
+@lru_cache(maxsize=1024)
+def _split_target(target_url):
+    """
+    Returns (base_url, slug, norm_target) for a page URL; the slug is empty for the homepage
+    and norm_target is the URL without its trailing slash.
     """
-    
-    # 1. Parse URL to get domain and slug
     parsed = urlparse(target_url)
     base_url = f"{parsed.scheme}://{parsed.netloc}"
-    
-    # Simple slug extraction (removes trailing slash)
     path_parts = parsed.path.strip("/").split("/")
     slug = path_parts[-1] if path_parts else ""
-    
-    if not slug:
-        # If slug is empty, it might be the homepage.
-        # We will try to find the page by matching the 'link' field in the API response.
-        pass # We'll handle this in the search loop below
-
-    auth = (username, app_password)
-    headers = {
-        "Content-Type": "application/json",
-        "User-Agent": "Gemini-SEO-Updater/1.0"
-    }
+    return base_url, slug, target_url.rstrip('/')
+
+# Runs the pages and posts searches for one lookup side by side
+_LOOKUP_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="wp-lookup")
+
+# Resolved page URL -> (post_type, post_id), so repeat pushes to a page skip the search
+WP_ID_CACHE_SIZE = 1024
+# Pages can be deleted or re-slugged in wp-admin, so matches are looked up again after a while
+WP_ID_CACHE_TTL = 300
+_post_ids = {}
+_post_ids_lock = threading.Lock()
+
+def _find_post(session, target_url):
+    """
+    Looks the URL up in the 'pages' then 'posts' endpoints.
+    Returns (post_type, post_id), or (None, None) when nothing matches.
+    Matches are remembered for WP_ID_CACHE_TTL seconds, or until forget_post() is called for the URL.
+    """
+    key = _split_target(target_url)[2]
+    with _post_ids_lock:
+        hit = _post_ids.get(key)
+    if hit and time.time() - hit[0] < WP_ID_CACHE_TTL:
+        return hit[1:]
+
+    found = _search_post(session, target_url)
+    if found[1]:
+        with _post_ids_lock:
+            _post_ids.pop(key, None)
+            _post_ids[key] = (time.time(), *found)
+            # Oldest entries go first once the cache is full
+            while len(_post_ids) > WP_ID_CACHE_SIZE:
+                del _post_ids[next(iter(_post_ids))]
+    return found
+
+def forget_post(target_url):
+    """Drops a cached lookup, e.g. after an update to that page failed."""
+    with _post_ids_lock:
+        _post_ids.pop(_split_target(target_url)[2], None)
+
+def clear_wp_id_cache():
+    """Drops every cached lookup."""
+    with _post_ids_lock:
+        _post_ids.clear()
+
+def _search_endpoint(session, base_url, ep, slug, norm_target):
+    """Returns the ID of the item in one endpoint ('pages' or 'posts') matching the URL, or None."""
+    search_api = f"{base_url}/wp-json/wp/v2/{ep}"
+    # _fields keeps WordPress from serializing (and sending) each post's full content
+    if slug:
+        params = {"slug": slug, "_fields": "id"}
+    else:
+        # For homepage (empty slug), list pages and find matching link; one full page
+        # of results instead of the default 10
+        params = {"per_page": 100, "_fields": "id,link"}
+
+    resp = session.get(search_api, params=params, timeout=10)
+    if resp.status_code != 200:
+        return None
+    results = orjson.loads(resp.content)
+    if not results:
+        return None
+    if slug:
+        # Exact slug match
+        return results[0]['id']
+    # Normalize URLs by stripping trailing slashes
+    return next((item['id'] for item in results if item['link'].rstrip('/') == norm_target), None)
+
+def _search_post(session, target_url):
+    base_url, slug, norm_target = _split_target(target_url)
+    # Both endpoints are queried at once; a page still wins over a post with the same slug
+    futures = [(ep, _LOOKUP_POOL.submit(_search_endpoint, session, base_url, ep, slug, norm_target)) for ep in ["pages", "posts"]]
+    for ep, future in futures:
+        post_id = future.result()
+        if post_id:
+            for _, other in futures:
+                other.cancel()
+            return ep, post_id
+    return None, None
+
+def push_schema_to_wordpress(target_url, username, app_password, schema_json_str):
+    """
+    1. Derives slug from URL.
+    2. Searches WP API for the Page/Post ID.
+    3. Updates the 'custom_schema_json' meta field.
+    """
+    base_url = _split_target(target_url)[0]
+
+    session = get_wp_session()
+    headers = {**WP_HEADERS, **wp_auth_header(username, app_password)}
 
-    # 2. Find the Post/Page ID
-    # We check both 'pages' and 'posts' endpoints
-    post_id = None
-    post_type = None
-    
-    endpoints = ["pages", "posts"]
-    
     try:
-        for ep in endpoints:
-            if slug:
-                search_api = f"{base_url}/wp-json/wp/v2/{ep}?slug={slug}"
-            else:
-                # For homepage (empty slug), list pages and find matching link
-                search_api = f"{base_url}/wp-json/wp/v2/{ep}"
-
-            print(f"Searching: {search_api}") # Debug
-            resp = requests.get(search_api, timeout=10)
-            
-            if resp.status_code == 200:
-                results = resp.json()
-                if results and len(results) > 0:
-                    if slug:
-                        # Exact slug match
-                        post_id = results[0]['id']
-                        post_type = ep
-                        break
-                    else:
-                        # URL match for homepage
-                        for item in results:
-                            # Normalize URLs by stripping trailing slashes
-                            if item['link'].rstrip('/') == target_url.rstrip('/'):
-                                post_id = item['id']
-                                post_type = ep
-                                break
-                    if post_id: break
+        # Find the Post/Page ID (pages first, then posts)
+        post_type, post_id = _find_post(session, target_url)
         
         if not post_id:
             return False, f"Error: Could not find a Page or Post matching URL '{target_url}' on {base_url}"
@@ -71,97 +166,205 @@ def push_schema_to_wordpress(target_url, username, app_password, schema_json_str
         # Note: Ensure register_meta() in PHP has 'show_in_rest' => true
         update_url = f"{base_url}/wp-json/wp/v2/{post_type}/{post_id}"
         
+        # Stored minified: the meta field is replaced on every push, and the indentation
+        # from the editor is only noise in the post meta table and the page source
+        try:
+            schema_json_str = orjson.dumps(orjson.loads(schema_json_str)).decode()
+        except ValueError:
+            pass
+
         payload = {
             "meta": {
                 "custom_schema_json": schema_json_str
             }
         }
 
-        update_resp = requests.post(
+        update_resp = session.post(
             update_url, 
-            auth=auth, 
-            json=payload, 
-            headers=headers
+            data=orjson.dumps(payload), 
+            # Only the status is read; without _fields WordPress echoes the whole post back
+            params={"_fields": "id"},
+            headers=headers,
+            timeout=10
         )
 
         if update_resp.status_code == 200:
             return True, f"Success! Updated {post_type} ID {post_id}. Status: {update_resp.status_code}"
         else:
+            # The page may have been deleted or re-created; look it up again next time
+            forget_post(target_url)
             return False, f"Failed to update. API Response: {update_resp.text}"
 
     except Exception as e:
         return False, f"Connection Error: {str(e)}"
 
-def update_page_meta(target_url, username, app_password, new_title, new_desc):
+# REST namespace each SEO plugin registers -> the meta key holding its description
+SEO_PLUGIN_META_KEYS = {
+    "yoast/v1": "_yoast_wpseo_metadesc",    # Yoast SEO
+    "rankmath/v1": "rank_math_description", # RankMath
+    "aioseo/v1": "_aioseop_description",    # All in One SEO
+}
+
+# A plugin can be switched on or off in wp-admin, and None means the index could not be read,
+# so detection is repeated after a while and failures are not remembered at all
+SEO_PLUGIN_CACHE_TTL = 600
+
+@_ttl_cache(maxsize=64, ttl=SEO_PLUGIN_CACHE_TTL, cache_none=False)
+def _seo_meta_keys(base_url):
     """
-    Updates the Page Title and a custom meta description field.
+    Reads the site's REST index and returns the description meta keys of the SEO
+    plugins it has active, or None when that can't be determined.
     """
-    # 1. Parse URL to get domain and slug
-    parsed = urlparse(target_url)
-    base_url = f"{parsed.scheme}://{parsed.netloc}"
-    path_parts = parsed.path.strip("/").split("/")
-    slug = path_parts[-1] if path_parts else ""
-    
-    auth = (username, app_password)
-    headers = {
-        "Content-Type": "application/json",
-        "User-Agent": "Gemini-SEO-Updater/1.0"
+    try:
+        resp = get_wp_session().get(f"{base_url}/wp-json/", params={"_fields": "namespaces"}, timeout=10)
+        if resp.status_code != 200:
+            return None
+        namespaces = set(orjson.loads(resp.content).get("namespaces", []))
+    except Exception:
+        return None
+    return tuple(key for ns, key in SEO_PLUGIN_META_KEYS.items() if ns in namespaces)
+
+def _meta_payload(new_title, new_desc, seo_keys=None):
+    # The custom field is always set; plugin fields only for the plugins the site runs.
+    # If detection failed, every supported plugin's field is sent as before.
+    if seo_keys is None:
+        seo_keys = SEO_PLUGIN_META_KEYS.values()
+    meta_payload = {"custom_meta_description": new_desc}  # Legacy/Custom
+    for key in seo_keys:
+        meta_payload[key] = new_desc
+
+    return {
+        "title": new_title,
+        "meta": meta_payload
     }
 
-    # 2. Find Post ID (Reuse logic or copy-paste for independence)
-    post_id = None
-    post_type = None
-    endpoints = ["pages", "posts"]
+def _post_meta_update(session, base_url, auth_header, post_type, post_id, new_title, new_desc):
+    update_url = f"{base_url}/wp-json/wp/v2/{post_type}/{post_id}"
+    headers = {**WP_HEADERS, **auth_header}
+    update_resp = session.post(update_url, data=orjson.dumps(_meta_payload(new_title, new_desc, _seo_meta_keys(base_url))), params={"_fields": "id"}, headers=headers, timeout=10)
     
+    if update_resp.status_code == 200:
+        return True, f"Updated ID {post_id}"
+    else:
+        return False, f"Failed: {update_resp.text}"
+
+def update_page_meta(target_url, username, app_password, new_title, new_desc):
+    """
+    Updates the Page Title and a custom meta description field.
+    """
+    base_url = _split_target(target_url)[0]
+    session = get_wp_session()
+    auth_header = wp_auth_header(username, app_password)
+
     try:
-        for ep in endpoints:
-            if slug:
-                search_api = f"{base_url}/wp-json/wp/v2/{ep}?slug={slug}"
-            else:
-                search_api = f"{base_url}/wp-json/wp/v2/{ep}"
-
-            resp = requests.get(search_api, timeout=10)
-            if resp.status_code == 200:
-                results = resp.json()
-                if results:
-                    if slug:
-                        post_id = results[0]['id']
-                        post_type = ep
-                        break
-                    else:
-                        for item in results:
-                            if item['link'].rstrip('/') == target_url.rstrip('/'):
-                                post_id = item['id']
-                                post_type = ep
-                                break
-                    if post_id: break
+        post_type, post_id = _find_post(session, target_url)
         
         if not post_id:
             return False, f"ID not found for {target_url}"
 
-        # 3. Update Title and Meta
-        update_url = f"{base_url}/wp-json/wp/v2/{post_type}/{post_id}"
-        
-        # We try to update multiple common meta fields for SEO description
-        # to support Yoast, RankMath, AIOSEO, and custom setups.
-        meta_payload = {
-            "custom_meta_description": new_desc,  # Legacy/Custom
-            "_yoast_wpseo_metadesc": new_desc,    # Yoast SEO
-            "rank_math_description": new_desc,    # RankMath
-            "_aioseop_description": new_desc      # All in One SEO
-        }
+        success, msg = _post_meta_update(session, base_url, auth_header, post_type, post_id, new_title, new_desc)
+        if not success:
+            forget_post(target_url)
+        return success, msg
 
-        payload = {
-            "title": new_title,
-            "meta": meta_payload
-        }
+    except Exception as e:
+        return False, str(e)
 
-        update_resp = requests.post(update_url, auth=auth, json=payload, headers=headers)
-        
-        if update_resp.status_code == 200:
-            return True, f"Updated ID {post_id}"
+def batch_update_meta(base_url, username, app_password, items):
+    """
+    Sends up to WP_BATCH_SIZE title/description updates in one /batch/v1 request.
+    items: list of (post_type, post_id, new_title, new_desc).
+    Returns one (success, message) per item, or None if the site has no batch endpoint.
+    """
+    session = get_wp_session()
+    seo_keys = _seo_meta_keys(base_url)
+    payload = {
+        "requests": [
+            {"method": "POST", "path": f"/wp/v2/{post_type}/{post_id}?_fields=id", "body": _meta_payload(new_title, new_desc, seo_keys)}
+            for post_type, post_id, new_title, new_desc in items
+        ]
+    }
+    resp = session.post(
+        f"{base_url}/wp-json/batch/v1",
+        data=orjson.dumps(payload),
+        headers={**WP_HEADERS, **wp_auth_header(username, app_password)},
+        timeout=30
+    )
+
+    # Older WordPress (< 5.6) has no batch route
+    if resp.status_code == 404:
+        return None
+    if resp.status_code not in (200, 207):
+        return [(False, f"Failed: {resp.text}")] * len(items)
+
+    responses = orjson.loads(resp.content).get("responses", [])
+    results = []
+    for (post_type, post_id, _, _), sub in zip(items, responses):
+        if sub.get("status") == 200:
+            results.append((True, f"Updated ID {post_id}"))
         else:
-            return False, f"Failed: {update_resp.text}"
+            results.append((False, f"Failed: {orjson.dumps(sub.get('body')).decode()}"))
+    # A short response list means the remaining sub-requests were not run
+    results += [(False, "Failed: no response in batch")] * (len(items) - len(results))
+    return results
 
-    except Exception as e:
-        return False, str(e)
\ No newline at end of file
+def iter_meta_updates(rows, username, app_password, max_workers=6):
+    """
+    Applies (url, new_title, new_desc) rows and yields (index, success, message) as each finishes.
+    Page IDs are resolved concurrently, then updates go out WP_BATCH_SIZE at a time through
+    /batch/v1, falling back to one POST per page on sites without the batch endpoint.
+    """
+    session = get_wp_session()
+    auth_header = wp_auth_header(username, app_password)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 1. Resolve every URL to (post_type, post_id)
+        pending = {executor.submit(_find_post, session, url): ("find", i) for i, (url, _, _) in enumerate(rows)}
+        resolved = {}  # base_url -> [(index, post_type, post_id)]
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, job = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    indexes = [job] if kind in ("find", "single") else [entry[0] for entry in job[1]]
+                    for i in indexes:
+                        yield i, False, str(e)
+                    continue
+
+                if kind == "find":
+                    i = job
+                    post_type, post_id = result
+                    if not post_id:
+                        yield i, False, f"ID not found for {rows[i][0]}"
+                        continue
+                    resolved.setdefault(_split_target(rows[i][0])[0], []).append((i, post_type, post_id))
+
+                elif kind == "batch":
+                    base_url, chunk = job
+                    if result is None:
+                        # No batch endpoint: update these pages one request at a time
+                        for idx, pt, pid in chunk:
+                            pending[executor.submit(_post_meta_update, session, base_url, auth_header, pt, pid, rows[idx][1], rows[idx][2])] = ("single", idx)
+                        continue
+                    for (idx, _, _), (success, msg) in zip(chunk, result):
+                        if not success:
+                            forget_post(rows[idx][0])
+                        yield idx, success, msg
+
+                else:
+                    success, msg = result
+                    if not success:
+                        forget_post(rows[job][0])
+                    yield job, success, msg
+
+            # 2. Once every lookup is in, send each site's updates in full batches
+            if resolved and not any(kind == "find" for kind, _ in pending.values()):
+                for base_url, entries in resolved.items():
+                    for start in range(0, len(entries), WP_BATCH_SIZE):
+                        chunk = entries[start:start + WP_BATCH_SIZE]
+                        items = [(pt, pid, rows[idx][1], rows[idx][2]) for idx, pt, pid in chunk]
+                        pending[executor.submit(batch_update_meta, base_url, username, app_password, items)] = ("batch", (base_url, chunk))
+                resolved = {}
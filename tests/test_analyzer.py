@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from seo_auditor.analyzer import analyze_page
+
+URL = "https://example.com/page"
+HTML = b"<html><head><title>Hello</title></head><body><h1>Hi</h1></body></html>"
+
+@patch('seo_auditor.analyzer.store_page_entry')
+@patch('seo_auditor.analyzer.get_page_entry', return_value=None)
+class TestPageSize(unittest.TestCase):
+    def analyze(self, body, headers):
+        response = MagicMock(status_code=200, url=URL, headers=headers)
+        response.raw.read.side_effect = lambda n, decode_content: body[:n]
+        session = MagicMock()
+        session.head.return_value = MagicMock(status_code=200, headers={"Content-Type": "text/html"})
+        session.get.return_value.__enter__.return_value = response
+        return analyze_page(URL, "example.com", session=session)
+
+    def test_size_comes_from_content_length(self, *_):
+        with patch('seo_auditor.analyzer.MAX_HTML_BYTES', 1024):
+            result = self.analyze(HTML * 100, {"Content-Type": "text/html", "Content-Length": str(len(HTML) * 100)})
+
+        # The full size is reported although only MAX_HTML_BYTES were read
+        self.assertEqual(result["page_size_kb"], round(len(HTML) * 100 / 1024, 2))
+        self.assertTrue(any(i.startswith("Large Page") for i in result["issues_found"]))
+
+    def test_compressed_or_unsized_responses_use_the_bytes_read(self, *_):
+        for headers in ({"Content-Type": "text/html"},
+                        {"Content-Type": "text/html", "Content-Length": "10", "Content-Encoding": "gzip"}):
+            result = self.analyze(HTML, headers)
+            self.assertEqual(result["page_size_kb"], round(len(HTML) / 1024, 2))
+            self.assertFalse(any(i.startswith("Large Page") for i in result["issues_found"]))
+
+    def test_threshold_follows_max_html_bytes(self, *_):
+        # Flagged above the 2 MiB read cap, not at the old 2000 KB mark below it
+        result = self.analyze(HTML, {"Content-Type": "text/html", "Content-Length": str(2049 * 1024)})
+        self.assertIn("Large Page (>2MB)", result["issues_found"])
+
+        result = self.analyze(HTML, {"Content-Type": "text/html", "Content-Length": str(2040 * 1024)})
+        self.assertFalse(any(i.startswith("Large Page") for i in result["issues_found"]))
+
+if __name__ == '__main__':
+    unittest.main()
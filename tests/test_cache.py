@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch
+from seo_auditor import cache
+
+class TestTtlCache(unittest.TestCase):
+    def make_cached(self, returns=lambda args: args[-1], **options):
+        calls = []
+
+        @cache._ttl_cache(maxsize=2, ttl=10, **options)
+        def lookup(*args):
+            calls.append(args)
+            return returns(args)
+
+        return lookup, calls
+
+    def setUp(self):
+        self.now = [1000.0]
+        patcher = patch('seo_auditor.cache.time.monotonic', side_effect=lambda: self.now[0])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hits_until_ttl_expires(self):
+        lookup, calls = self.make_cached()
+        lookup("a")
+        self.now[0] += 9
+        lookup("a")
+        self.assertEqual(calls, [("a",)])
+
+        self.now[0] += 2
+        lookup("a")
+        self.assertEqual(calls, [("a",), ("a",)])
+
+    def test_least_recently_used_entry_is_evicted(self):
+        lookup, calls = self.make_cached()
+        lookup("a"); lookup("b"); lookup("a"); lookup("c")
+        calls.clear()
+
+        lookup("a"); lookup("c")
+        self.assertEqual(calls, [])
+        lookup("b")
+        self.assertEqual(calls, [("b",)])
+
+    def test_invalidate_by_prefix_and_clear(self):
+        lookup, calls = self.make_cached()
+        lookup("site1", 10); lookup("site2", 10)
+        lookup.cache_invalidate("site1")
+        calls.clear()
+
+        lookup("site1", 10); lookup("site2", 10)
+        self.assertEqual(calls, [("site1", 10)])
+
+        lookup.cache_clear()
+        lookup("site2", 10)
+        self.assertEqual(calls, [("site1", 10), ("site2", 10)])
+
+    def test_empty_results_are_retried_when_not_cached(self):
+        lookup, calls = self.make_cached(cache_empty=False, returns=lambda args: ())
+        lookup("a"); lookup("a")
+        self.assertEqual(len(calls), 2)
+
+    def test_peek_does_not_call_or_store(self):
+        lookup, calls = self.make_cached()
+        self.assertIsNone(lookup.cache_peek("a"))
+        lookup("a")
+        self.assertEqual(lookup.cache_peek("a"), "a")
+
+        self.now[0] += 11
+        self.assertIsNone(lookup.cache_peek("a"))
+        self.assertEqual(calls, [("a",)])
+
+    def test_cache_none_false_keeps_empty_but_not_none(self):
+        lookup, calls = self.make_cached(cache_none=False, returns=lambda args: None)
+        lookup("a"); lookup("a")
+        self.assertEqual(len(calls), 2)
+
+        lookup, calls = self.make_cached(cache_none=False, returns=lambda args: ())
+        lookup("a"); lookup("a")
+        self.assertEqual(len(calls), 1)
+
+class TestGetSitemap(unittest.TestCase):
+    def setUp(self):
+        cache._fetch_and_parse.cache_clear()
+        self.addCleanup(cache._fetch_and_parse.cache_clear)
+
+    @patch('seo_auditor.cache.iter_sitemap_urls')
+    def test_limit_counts_distinct_pages(self, mock_iter):
+        mock_iter.side_effect = lambda url: iter([
+            "https://example.com/a", "https://example.com/a/", "https://EXAMPLE.com/a#top",
+            "https://example.com/b", "https://example.com/b/", "https://example.com/c",
+            "https://example.com/d",
+        ])
+
+        urls = cache.get_sitemap("https://example.com/", limit=3)
+
+        self.assertEqual(urls, ("https://example.com/a", "https://example.com/b", "https://example.com/c"))
+
+    @patch('seo_auditor.cache.iter_sitemap_urls')
+    def test_limited_lookups_reuse_the_full_sitemap(self, mock_iter):
+        mock_iter.side_effect = lambda url: iter([f"https://example.com/{n}" for n in range(5)])
+
+        # Audit tab first: only the pages it needs are read
+        self.assertEqual(len(cache.get_sitemap("https://example.com/", limit=2)), 2)
+        # Sitemap tab: the full list is fetched once...
+        self.assertEqual(len(cache.get_sitemap("https://example.com/")), 5)
+        # ...and then answers the Audit tab, whatever its limit
+        self.assertEqual(cache.get_sitemap("https://example.com/", limit=3),
+                         ("https://example.com/0", "https://example.com/1", "https://example.com/2"))
+        self.assertEqual(len(cache.get_sitemap("https://example.com/", limit=2)), 2)
+        self.assertEqual(mock_iter.call_count, 2)
+
+    @patch('seo_auditor.cache.iter_sitemap_urls')
+    def test_falls_back_to_sitemap_index(self, mock_iter):
+        mock_iter.side_effect = lambda url: iter(["https://example.com/x"] if url.endswith("sitemap_index.xml") else [])
+
+        self.assertEqual(cache.get_sitemap("https://example.com/page"), ("https://example.com/x",))
+        self.assertEqual([c.args[0] for c in mock_iter.call_args_list],
+                         ["https://example.com/sitemap.xml", "https://example.com/sitemap_index.xml"])
+
+if __name__ == '__main__':
+    unittest.main()
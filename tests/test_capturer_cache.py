@@ -0,0 +1,41 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from seo_auditor import capturer
+
+class TestScreenshotCacheLocation(unittest.TestCase):
+    def test_cache_is_outside_the_served_root(self):
+        # The UI serves SCREENSHOT_ROOT as static files; cached captures must not be reachable there
+        root = os.path.realpath(capturer.SCREENSHOT_ROOT)
+        cache_dir = os.path.realpath(capturer.SCREENSHOT_CACHE_DIR)
+        self.assertNotEqual(os.path.commonpath([root, cache_dir]), root)
+
+class TestScreenshotCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = os.path.join(tmp.name, "served")
+        self.cache_dir = os.path.join(tmp.name, "cache")
+        for name, value in (("SCREENSHOT_ROOT", self.root), ("SCREENSHOT_CACHE_DIR", self.cache_dir)):
+            patcher = patch.object(capturer, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @patch('seo_auditor.capturer.async_playwright')
+    def test_cached_pages_are_linked_into_the_run_folder(self, mock_playwright):
+        os.makedirs(self.cache_dir)
+        with open(capturer._screenshot_cache_path("https://example.com"), "wb") as f:
+            f.write(b"png")
+
+        folder, paths = asyncio.run(capturer.capture_screenshots(["https://example.com"]))
+
+        mock_playwright.assert_not_called()
+        self.assertEqual(paths, [os.path.join(folder, "1.png")])
+        self.assertEqual(os.path.commonpath([self.root, paths[0]]), self.root)
+        with open(paths[0], "rb") as f:
+            self.assertEqual(f.read(), b"png")
+
+if __name__ == '__main__':
+    unittest.main()
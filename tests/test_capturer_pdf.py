@@ -0,0 +1,121 @@
+import unittest
+import os
+import re
+import tempfile
+from PIL import Image
+from seo_auditor.capturer import create_pdf, _encode_page, PdfPageEncoder, PDF_MAX_WIDTH, PDF_RESOLUTION, PDF_POOL_MIN_PAGES
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+class TestCreatePdf(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # One page wider than PDF_MAX_WIDTH (downscaled) and one small page
+        self.sizes = [(PDF_MAX_WIDTH * 2, 600), (300, 500)]
+        self.paths = []
+        for i, size in enumerate(self.sizes):
+            path = os.path.join(self.tmp.name, f"{i + 1}.png")
+            Image.new("RGB", size, (200, 30 * i, 90)).save(path)
+            self.paths.append(path)
+        self.pdf_path = os.path.join(self.tmp.name, "out.pdf")
+
+    def _expected_boxes(self):
+        boxes = []
+        for width, height in self.sizes:
+            if width > PDF_MAX_WIDTH:
+                width, height = PDF_MAX_WIDTH, int(height * PDF_MAX_WIDTH / width)
+            boxes.append((width * 72.0 / PDF_RESOLUTION, height * 72.0 / PDF_RESOLUTION))
+        return boxes
+
+    def test_xref_offsets_point_at_objects(self):
+        self.assertEqual(create_pdf(self.paths, self.pdf_path), self.pdf_path)
+        with open(self.pdf_path, "rb") as f:
+            data = f.read()
+
+        self.assertTrue(data.startswith(b"%PDF-1.4"))
+        self.assertTrue(data.rstrip().endswith(b"%%EOF"))
+
+        startxref = int(re.search(rb"startxref\n(\d+)\n%%EOF", data).group(1))
+        self.assertTrue(data[startxref:].startswith(b"xref\n"))
+
+        header = re.match(rb"xref\n0 (\d+)\n", data[startxref:])
+        size = int(header.group(1))
+        entries = data[startxref + header.end():].split(b"\n")[:size]
+        self.assertEqual(entries[0], b"0000000000 65535 f ")
+        for number, entry in enumerate(entries[1:], start=1):
+            offset = int(entry[:10])
+            self.assertTrue(data[offset:].startswith(f"{number} 0 obj\n".encode()), number)
+
+        self.assertIn(f"/Size {size} /Root 1 0 R".encode(), data)
+        # Catalog, page tree, and three objects per page
+        self.assertEqual(size - 1, 2 + 3 * len(self.paths))
+
+    def test_page_count_and_media_box(self):
+        create_pdf(self.paths, self.pdf_path)
+        with open(self.pdf_path, "rb") as f:
+            data = f.read()
+
+        self.assertIn(f"/Count {len(self.paths)}".encode(), data)
+        boxes = [tuple(map(float, m)) for m in re.findall(rb"/MediaBox \[0 0 ([\d.]+) ([\d.]+)\]", data)]
+        self.assertEqual(len(boxes), len(self.paths))
+        for box, expected in zip(boxes, self._expected_boxes()):
+            self.assertAlmostEqual(box[0], expected[0], places=1)
+            self.assertAlmostEqual(box[1], expected[1], places=1)
+
+    @unittest.skipUnless(pypdf, "pypdf not installed")
+    def test_readable_by_pdf_library(self):
+        create_pdf(self.paths, self.pdf_path)
+        reader = pypdf.PdfReader(self.pdf_path, strict=True)
+
+        self.assertEqual(len(reader.pages), len(self.paths))
+        for page, expected in zip(reader.pages, self._expected_boxes()):
+            self.assertAlmostEqual(float(page.mediabox.width), expected[0], places=1)
+            self.assertAlmostEqual(float(page.mediabox.height), expected[1], places=1)
+            image = page["/Resources"]["/XObject"]["/Im0"].get_object()
+            self.assertEqual(image["/Filter"], "/DCTDecode")
+
+    def test_unreadable_images_are_skipped(self):
+        broken = os.path.join(self.tmp.name, "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+
+        self.assertIsNone(_encode_page(broken))
+        create_pdf([broken, self.paths[1]], self.pdf_path)
+        with open(self.pdf_path, "rb") as f:
+            self.assertIn(b"/Count 1", f.read())
+
+        self.assertIsNone(create_pdf([broken], os.path.join(self.tmp.name, "none.pdf")))
+
+class TestPdfPageEncoder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "1.png")
+        Image.new("RGB", (40, 30), (10, 20, 30)).save(self.path)
+
+    def test_small_runs_encode_in_process(self):
+        encoder = PdfPageEncoder(PDF_POOL_MIN_PAGES - 1)
+        encoder.submit(self.path)
+        self.assertIsNone(encoder._executor)
+
+        jpeg_bytes, width, height = encoder.result(self.path)
+        self.assertTrue(jpeg_bytes.startswith(b"\xff\xd8"))
+        self.assertEqual((width, height), (40, 30))
+        encoder.shutdown()
+
+    def test_pool_starts_on_first_submit(self):
+        encoder = PdfPageEncoder(PDF_POOL_MIN_PAGES)
+        self.assertIsNone(encoder._executor)
+        try:
+            encoder.submit(self.path)
+            self.assertIsNotNone(encoder._executor)
+            self.assertEqual(encoder.result(self.path)[1:], (40, 30))
+        finally:
+            encoder.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import io
+import unittest
+from unittest.mock import MagicMock
+from seo_auditor.crawler import iter_sitemap_urls
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+def urlset(*locs, ns=SITEMAP_NS):
+    xmlns = f' xmlns="{ns}"' if ns else ""
+    entries = "".join(f"<url><loc> {loc} </loc></url>" for loc in locs)
+    return f'<?xml version="1.0"?><urlset{xmlns}>{entries}</urlset>'.encode()
+
+def sitemap_index(*locs):
+    entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<?xml version="1.0"?><sitemapindex xmlns="{SITEMAP_NS}">{entries}</sitemapindex>'.encode()
+
+def fake_session(documents):
+    """Session whose get() serves documents[url], or a 404 for anything else."""
+    session = MagicMock()
+    requested = []
+
+    def get(url, **kwargs):
+        requested.append(url)
+        response = MagicMock()
+        response.status_code = 200 if url in documents else 404
+        response.raw = io.BytesIO(documents.get(url, b""))
+        response.__enter__.return_value = response
+        return response
+
+    session.get.side_effect = get
+    session.requested = requested
+    return session
+
+class TestIterSitemapUrls(unittest.TestCase):
+    def test_urlset_in_document_order(self):
+        session = fake_session({"https://a.com/sitemap.xml": urlset("https://a.com/1", "https://a.com/2")})
+        urls = list(iter_sitemap_urls("https://a.com/sitemap.xml", session))
+        self.assertEqual(urls, ["https://a.com/1", "https://a.com/2"])
+
+    def test_namespace_is_not_required(self):
+        for ns in ("", "http://www.google.com/schemas/sitemap/0.84"):
+            session = fake_session({"https://a.com/s.xml": urlset("https://a.com/1", ns=ns)})
+            self.assertEqual(list(iter_sitemap_urls("https://a.com/s.xml", session)), ["https://a.com/1"], ns)
+
+    def test_nested_index_is_followed_and_urls_yielded_once(self):
+        session = fake_session({
+            "https://a.com/index.xml": sitemap_index("https://a.com/pages.xml", "https://a.com/posts.xml"),
+            "https://a.com/pages.xml": urlset("https://a.com/1", "https://a.com/2"),
+            "https://a.com/posts.xml": urlset("https://a.com/2", "https://a.com/3"),
+        })
+        urls = list(iter_sitemap_urls("https://a.com/index.xml", session))
+        self.assertEqual(urls, ["https://a.com/1", "https://a.com/2", "https://a.com/3"])
+
+    def test_index_cycles_are_not_refetched(self):
+        session = fake_session({
+            "https://a.com/index.xml": sitemap_index("https://a.com/child.xml", "https://a.com/index.xml"),
+            "https://a.com/child.xml": sitemap_index("https://a.com/index.xml", "https://a.com/pages.xml"),
+            "https://a.com/pages.xml": urlset("https://a.com/1"),
+        })
+        urls = list(iter_sitemap_urls("https://a.com/index.xml", session))
+
+        self.assertEqual(urls, ["https://a.com/1"])
+        self.assertEqual(sorted(session.requested),
+                         ["https://a.com/child.xml", "https://a.com/index.xml", "https://a.com/pages.xml"])
+
+    def test_missing_sitemap_yields_nothing(self):
+        self.assertEqual(list(iter_sitemap_urls("https://a.com/none.xml", fake_session({}))), [])
+
+    def test_stops_reading_when_caller_stops(self):
+        session = fake_session({
+            "https://a.com/index.xml": sitemap_index("https://a.com/pages.xml", "https://a.com/more.xml"),
+            "https://a.com/pages.xml": urlset("https://a.com/1", "https://a.com/2"),
+            "https://a.com/more.xml": urlset("https://a.com/3"),
+        })
+        urls = iter_sitemap_urls("https://a.com/index.xml", session)
+        self.assertEqual(next(urls), "https://a.com/1")
+        urls.close()
+        self.assertNotIn("https://a.com/more.xml", session.requested)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import orjson
+from seo_auditor.meta_gen import generate_meta_batch
+
+def context(n):
+    return {"url": f"https://example.com/{n}", "old_title": f"Old {n}", "old_desc": f"Old desc {n}", "snippet": "H1: x"}
+
+def reply(text):
+    return MagicMock(text=text)
+
+@patch('seo_auditor.meta_gen._wait_for_rate_limit')
+class TestGenerateMetaBatch(unittest.TestCase):
+    def test_one_prompt_for_the_whole_batch(self, _):
+        contexts = [context(1), context(2)]
+        model = MagicMock()
+        model.generate_content.return_value = reply(orjson.dumps([
+            # Reply order does not have to match the input order
+            {"url": "https://example.com/2", "title": "New 2", "description": "Desc 2"},
+            {"url": "https://example.com/1", "title": "New 1", "description": ""},
+        ]).decode())
+
+        rows = generate_meta_batch(contexts, model)
+
+        model.generate_content.assert_called_once()
+        self.assertEqual([r["URL"] for r in rows], ["https://example.com/1", "https://example.com/2"])
+        self.assertEqual(rows[0]["New Title"], "New 1")
+        # An empty suggestion keeps the current value
+        self.assertEqual(rows[0]["New Desc"], "Old desc 1")
+        self.assertEqual(rows[1]["New Desc"], "Desc 2")
+
+    def test_pages_missing_from_reply_are_prompted_individually(self, _):
+        contexts = [context(1), context(2), context(3)]
+        model = MagicMock()
+        model.generate_content.side_effect = [
+            reply('```json\n[{"url": "https://example.com/2", "title": "New 2", "description": "Desc 2"}]\n```'),
+            reply('{"title": "Single 1", "description": "One"}'),
+            reply('{"title": "Single 3", "description": "Three"}'),
+        ]
+
+        rows = generate_meta_batch(contexts, model)
+
+        self.assertEqual(model.generate_content.call_count, 3)
+        self.assertEqual([r["New Title"] for r in rows], ["Single 1", "New 2", "Single 3"])
+        self.assertIn("https://example.com/3", model.generate_content.call_args_list[2].args[0])
+
+    def test_unparseable_reply_falls_back_for_every_page(self, _):
+        contexts = [context(1), context(2)]
+        model = MagicMock()
+        model.generate_content.side_effect = [
+            reply("Sorry, I can't help with that."),
+            reply('{"title": "Single 1", "description": "One"}'),
+            reply('{"title": "Single 2", "description": "Two"}'),
+        ]
+
+        rows = generate_meta_batch(contexts, model)
+
+        self.assertEqual([r["New Title"] for r in rows], ["Single 1", "Single 2"])
+
+    def test_failed_batch_call_falls_back_and_reports_errors_per_page(self, _):
+        contexts = [context(1), context(2)]
+        model = MagicMock()
+        model.generate_content.side_effect = [
+            RuntimeError("quota"),
+            reply('{"title": "Single 1", "description": "One"}'),
+            RuntimeError("quota"),
+        ]
+
+        rows = generate_meta_batch(contexts, model)
+
+        self.assertEqual(rows[0]["New Title"], "Single 1")
+        self.assertEqual(rows[1]["Old Title"], "Error")
+
+    def test_single_page_skips_the_batch_prompt(self, _):
+        model = MagicMock()
+        model.generate_content.return_value = reply('{"title": "Single", "description": "One"}')
+
+        rows = generate_meta_batch([context(1)], model)
+
+        self.assertEqual(rows[0]["New Title"], "Single")
+        self.assertNotIn("JSON array", model.generate_content.call_args.args[0])
+
+if __name__ == '__main__':
+    unittest.main()
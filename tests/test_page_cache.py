@@ -0,0 +1,92 @@
+import unittest
+import tempfile
+import time
+from unittest.mock import patch, MagicMock
+import diskcache
+from seo_auditor import cache
+from seo_auditor.analyzer import analyze_page
+
+URL = "https://example.com/page"
+
+def cached_entry(links):
+    row = {
+        "url": URL, "status_code": 200, "load_time_s": 1.5, "cached_result": False,
+        "internal_broken_links": 1, "external_broken_links": 0,
+        "issues_found": ["Missing H1", "1 Internal Broken Links"],
+    }
+    return {"etag": '"v1"', "last_modified": None, "result_row": row, "links": links, "fetched": 0}
+
+class TestPageCacheExpiry(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        disk = diskcache.Cache(tmp.name)
+        self.addCleanup(disk.close)
+        patcher = patch.object(cache, "_page_cache", disk)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_round_trip_with_links(self):
+        cache.store_page_entry(URL, '"v1"', None, {"url": URL}, ["https://example.com/a"])
+        entry = cache.get_page_entry(URL)
+        self.assertEqual(entry["etag"], '"v1"')
+        self.assertEqual(entry["links"], ["https://example.com/a"])
+
+    def test_entries_expire(self):
+        with patch.object(cache, "AUDIT_CACHE_TTL", 0.05):
+            cache.store_page_entry(URL, '"v1"', None, {"url": URL})
+        time.sleep(0.1)
+        self.assertIsNone(cache.get_page_entry(URL))
+
+    def test_pages_without_validators_are_not_stored(self):
+        cache.store_page_entry(URL, None, None, {"url": URL})
+        self.assertIsNone(cache.get_page_entry(URL))
+
+class TestRevalidatedPage(unittest.TestCase):
+    def session_returning_304(self):
+        response = MagicMock(status_code=304)
+        session = MagicMock()
+        session.get.return_value.__enter__.return_value = response
+        return session
+
+    @patch('seo_auditor.analyzer.check_link_status')
+    @patch('seo_auditor.analyzer.get_page_entry')
+    def test_links_are_rechecked_and_row_is_flagged(self, mock_entry, mock_check):
+        mock_entry.return_value = cached_entry(["https://example.com/a", "https://example.com/b", "https://other.com/c"])
+        # Both internal links are broken now, the external one is fine
+        mock_check.side_effect = lambda link, session: "example.com/" in link
+
+        result = analyze_page(URL, "example.com", session=self.session_returning_304())
+
+        self.assertTrue(result["cached_result"])
+        self.assertEqual(result["internal_broken_links"], 2)
+        self.assertEqual(result["external_broken_links"], 0)
+        self.assertEqual(result["issues_found"], ["Missing H1", "2 Internal Broken Links"])
+        # Timing is the cached measurement, flagged by cached_result
+        self.assertEqual(result["load_time_s"], 1.5)
+
+    @patch('seo_auditor.analyzer.check_link_status', return_value=False)
+    @patch('seo_auditor.analyzer.get_page_entry')
+    def test_fixed_links_clear_the_issue(self, mock_entry, mock_check):
+        mock_entry.return_value = cached_entry(["https://example.com/a"])
+
+        result = analyze_page(URL, "example.com", session=self.session_returning_304())
+
+        self.assertEqual(result["internal_broken_links"], 0)
+        self.assertEqual(result["issues_found"], ["Missing H1"])
+
+    @patch('seo_auditor.analyzer.check_link_status')
+    @patch('seo_auditor.analyzer.get_page_entry')
+    def test_old_entries_without_links_are_only_flagged(self, mock_entry, mock_check):
+        entry = cached_entry(None)
+        del entry["links"]
+        mock_entry.return_value = entry
+
+        result = analyze_page(URL, "example.com", session=self.session_returning_304())
+
+        mock_check.assert_not_called()
+        self.assertTrue(result["cached_result"])
+        self.assertEqual(result["internal_broken_links"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import openpyxl
+from seo_auditor import reporter
+from seo_auditor.reporter import build_audit_frame, prepare_dataframe, save_excel, COLUMN_DTYPES
+
+def page(n, **overrides):
+    row = {
+        "url": f"https://example.com/{n}", "status_code": 200, "status_type": "Success",
+        "https_ok": True, "page_size_kb": 12.5, "schema_types": "WebPage",
+        "title": f"Page {n}", "title_len": 6, "meta_description": "", "meta_description_len": 0,
+        "h1_text": "Hi", "h1_count": 1, "word_count": 100, "canonical": "",
+        "internal_links": 3, "external_links": 1, "internal_broken_links": 0, "external_broken_links": 0,
+        "load_time_s": 0.2, "cached_result": False,
+        "multiple_title_tags": False, "h1_equals_title": False, "sequential_h1_error": False,
+        "missing_alt_count": 0, "issues_found": [],
+    }
+    row.update(overrides)
+    return row
+
+class TestBuildAuditFrame(unittest.TestCase):
+    def test_known_columns_get_compact_dtypes(self):
+        df = build_audit_frame([page(1), page(2, https_ok=False, internal_broken_links=4)])
+        for col, dtype in COLUMN_DTYPES.items():
+            self.assertEqual(str(df[col].dtype), dtype, col)
+        self.assertEqual(df["internal_broken_links"].tolist(), [0, 4])
+
+    def test_missing_values_fall_back_to_inferred_dtype(self):
+        # Non-HTML rows can lack fields; a None must not be forced into an int column
+        df = build_audit_frame([page(1), page(2, word_count=None)])
+        self.assertNotEqual(str(df["word_count"].dtype), "int32")
+        self.assertTrue(df["word_count"].isna()[1])
+        self.assertEqual(df["word_count"][0], 100)
+
+    def test_unknown_keys_are_kept_after_known_columns(self):
+        df = build_audit_frame([page(1, extra_metric=7)])
+        self.assertEqual(df.columns[-1], "extra_metric")
+
+    def test_empty_results(self):
+        self.assertTrue(build_audit_frame([]).empty)
+
+class TestSaveExcel(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "report.xlsx")
+
+    def frame(self, n):
+        return prepare_dataframe(build_audit_frame([page(i, issues_found=["Missing H1"] if i % 2 else []) for i in range(n)]))
+
+    def test_single_sheet_with_header_and_rows(self):
+        df = self.frame(3)
+        save_excel(df, self.path)
+
+        wb = openpyxl.load_workbook(self.path, read_only=True)
+        self.assertEqual(wb.sheetnames, ["Audit"])
+        rows = list(wb["Audit"].iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), list(df.columns))
+        self.assertEqual(len(rows), 4)
+        url_col = rows[0].index("url")
+        self.assertEqual([r[url_col] for r in rows[1:]], [f"https://example.com/{i}" for i in range(3)])
+        issues_col = rows[0].index("issues_found")
+        self.assertEqual([r[issues_col] for r in rows[1:]], ["✅ OK", "Missing H1", "✅ OK"])
+
+    def test_large_audits_are_split_into_page_sheets(self):
+        df = self.frame(5)
+        with patch.object(reporter, "MAX_ROWS_PER_SHEET", 2):
+            save_excel(df, self.path)
+
+        wb = openpyxl.load_workbook(self.path, read_only=True)
+        self.assertEqual(wb.sheetnames, ["Pages_001", "Pages_002", "Pages_003"])
+        urls = []
+        for name in wb.sheetnames:
+            rows = list(wb[name].iter_rows(values_only=True))
+            # Every shard repeats the header
+            self.assertEqual(list(rows[0]), list(df.columns))
+            urls += [r[rows[0].index("url")] for r in rows[1:]]
+        self.assertEqual(urls, [f"https://example.com/{i}" for i in range(5)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import orjson
+from seo_auditor.schema_gen import score_existing_schema
+
+class TestScoreExistingSchema(unittest.TestCase):
+    def test_missing_or_invalid_schema_scores_zero(self):
+        self.assertEqual(score_existing_schema(""), 0)
+        self.assertEqual(score_existing_schema("{not json"), 0)
+        self.assertEqual(score_existing_schema('{"name": "untyped"}'), 0)
+
+    def test_complete_specific_schema_scores_ten(self):
+        schema = {
+            "@context": "https://schema.org",
+            "@type": "Product",
+            "name": "Widget",
+            "url": "https://example.com/widget",
+            "description": "A widget.",
+            "image": "https://example.com/widget.png",
+        }
+        self.assertEqual(score_existing_schema(orjson.dumps(schema).decode()), 10)
+
+    def test_thin_generic_schema_scores_low(self):
+        schema = {"@context": "https://schema.org", "@type": "Organization", "name": "Acme"}
+        self.assertEqual(score_existing_schema(orjson.dumps(schema).decode()), 5)
+
+    def test_graph_members_and_type_lists_are_counted(self):
+        schema = {
+            "@context": "https://schema.org",
+            "@graph": [
+                {"@type": "WebSite", "name": "Acme"},
+                {"@type": ["Thing", "FAQPage"], "name": "FAQ", "url": "https://example.com/faq"},
+            ],
+        }
+        # context 2 + typed 2 + specific type 2 + best node's two core fields
+        self.assertEqual(score_existing_schema(orjson.dumps(schema).decode()), 8)
+
+    def test_only_structure_is_checked(self):
+        # Wrong values still score as complete; the heuristic never judges content
+        schema = {
+            "@context": "https://schema.org", "@type": "Product",
+            "name": "x", "url": "not a url", "description": "x", "image": "x",
+        }
+        self.assertEqual(score_existing_schema(orjson.dumps(schema).decode()), 10)
+
+if __name__ == '__main__':
+    unittest.main()
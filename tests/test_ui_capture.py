@@ -33,6 +33,15 @@ class TestUICapture(unittest.TestCase):
         self.assertEqual(pdf_path, "/tmp/screenshots.pdf")
         self.assertIn("converted to PDF", status)
 
+    @patch('seo_auditor.ui.capture_screenshots')
+    @patch('seo_auditor.ui.asyncio.run', return_value=("/tmp/folder", []))
+    def test_fresh_capture_bypasses_the_cache(self, mock_asyncio_run, mock_capture):
+        run_capture_ui("https://example.com")
+        self.assertTrue(mock_capture.call_args.kwargs["use_cache"])
+
+        run_capture_ui("https://example.com", fresh=True)
+        self.assertFalse(mock_capture.call_args.kwargs["use_cache"])
+
     @patch('seo_auditor.ui.asyncio.run')
     def test_run_capture_ui_failure(self, mock_asyncio_run):
         # Setup mocks to return failure (empty list of paths)
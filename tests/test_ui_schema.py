@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from seo_auditor.ui import auto_fix_schema, STRONG_SCHEMA_SCORE
+
+RESULT = ('{"@type": "Thing"}', '{"@type": "Product"}', 3, 9, "Added Product.")
+
+class TestAutoFixSchemaSkip(unittest.TestCase):
+    def run_auto_fix(self, force=False):
+        return auto_fix_schema("https://example.com/p", "key", "user", "pass", force=force, progress=MagicMock())
+
+    @patch('seo_auditor.ui.push_schema_to_wordpress')
+    @patch('seo_auditor.ui.generate_improved_schema')
+    @patch('seo_auditor.ui.score_existing_schema', return_value=STRONG_SCHEMA_SCORE)
+    @patch('seo_auditor.ui.fetch_current_schema', return_value=('{"@type": "Product"}', None))
+    def test_complete_schema_skips_llm(self, mock_fetch, mock_score, mock_generate, mock_push):
+        status, old_schema, new_schema, old_score, new_score = self.run_auto_fix()
+
+        mock_generate.assert_not_called()
+        mock_push.assert_not_called()
+        self.assertIn("not an AI score", status)
+        self.assertEqual(old_schema, '{"@type": "Product"}')
+        self.assertEqual(new_schema, "")
+        # The heuristic is not shown as the model's score
+        self.assertIsNone(old_score)
+        self.assertIsNone(new_score)
+
+    @patch('seo_auditor.ui.push_schema_to_wordpress', return_value=(True, "ok"))
+    @patch('seo_auditor.ui.generate_improved_schema', return_value=RESULT)
+    @patch('seo_auditor.ui.score_existing_schema', return_value=STRONG_SCHEMA_SCORE - 1)
+    @patch('seo_auditor.ui.fetch_current_schema', return_value=('{"@type": "Thing"}', None))
+    def test_weaker_schema_goes_to_llm(self, mock_fetch, mock_score, mock_generate, mock_push):
+        status = self.run_auto_fix()[0]
+
+        mock_generate.assert_called_once()
+        # The schema already read is passed on instead of being fetched again
+        self.assertEqual(mock_generate.call_args.kwargs["old_schema"], '{"@type": "Thing"}')
+        mock_push.assert_called_once()
+        self.assertIn("AUTO-FIX SUCCESSFUL", status)
+
+    @patch('seo_auditor.ui.push_schema_to_wordpress', return_value=(True, "ok"))
+    @patch('seo_auditor.ui.generate_improved_schema', return_value=RESULT)
+    @patch('seo_auditor.ui.score_existing_schema', return_value=10)
+    @patch('seo_auditor.ui.fetch_current_schema')
+    def test_force_skips_the_check(self, mock_fetch, mock_score, mock_generate, mock_push):
+        self.run_auto_fix(force=True)
+
+        mock_fetch.assert_not_called()
+        mock_score.assert_not_called()
+        mock_generate.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from seo_auditor.utils import canonical_url_key, dedupe_urls, iter_unique_urls
+
+class TestCanonicalUrlKey(unittest.TestCase):
+    def test_variants_of_one_page_share_a_key(self):
+        variants = [
+            "https://example.com/about",
+            "https://example.com/about/",
+            "HTTPS://Example.COM/about",
+            "https://example.com//about//",
+            "https://example.com/about#team",
+        ]
+        self.assertEqual({canonical_url_key(url) for url in variants}, {"https://example.com/about"})
+
+    def test_path_case_and_query_are_kept(self):
+        self.assertNotEqual(canonical_url_key("https://example.com/About"), canonical_url_key("https://example.com/about"))
+        self.assertNotEqual(canonical_url_key("https://example.com/p?id=1"), canonical_url_key("https://example.com/p?id=2"))
+        self.assertNotEqual(canonical_url_key("http://example.com/p"), canonical_url_key("https://example.com/p"))
+
+    def test_homepage_with_and_without_slash(self):
+        self.assertEqual(canonical_url_key("https://example.com/"), canonical_url_key("https://example.com"))
+
+class TestDedupeUrls(unittest.TestCase):
+    def test_keeps_first_spelling_and_order(self):
+        urls = ["https://a.com/x/", "https://a.com/y", "https://a.com/x", "https://A.com/y#top", "https://a.com/z"]
+        self.assertEqual(dedupe_urls(urls), ["https://a.com/x/", "https://a.com/y", "https://a.com/z"])
+
+    def test_iter_unique_urls_is_lazy(self):
+        def source():
+            yield "https://a.com/1"
+            yield "https://a.com/1/"
+            yield "https://a.com/2"
+            raise AssertionError("read past what the caller needed")
+
+        unique = iter_unique_urls(source())
+        self.assertEqual([next(unique), next(unique)], ["https://a.com/1", "https://a.com/2"])
+
+if __name__ == '__main__':
+    unittest.main()
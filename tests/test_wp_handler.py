@@ -0,0 +1,121 @@
+import threading
+import unittest
+from unittest.mock import patch
+from seo_auditor import wp_handler
+from seo_auditor.wp_handler import iter_meta_updates
+
+def find_post(session, url):
+    if url.endswith("/missing"):
+        return None, None
+    if url.endswith("/boom"):
+        raise ConnectionError("lookup failed")
+    return "pages", int(url.rstrip("/").rsplit("/p", 1)[1])
+
+class FakeSite:
+    """Records batch and single updates; batch_supported=False answers like WordPress < 5.6."""
+    def __init__(self, batch_supported=True, failing_ids=()):
+        self.batch_supported = batch_supported
+        self.failing_ids = set(failing_ids)
+        self.batches = []
+        self.singles = []
+        self.lock = threading.Lock()
+
+    def batch(self, base_url, username, app_password, items):
+        with self.lock:
+            self.batches.append((base_url, items))
+        if not self.batch_supported:
+            return None
+        return [(pid not in self.failing_ids, f"{base_url} {pid} {title}") for _, pid, title, _ in items]
+
+    def single(self, session, base_url, auth, post_type, post_id, new_title, new_desc):
+        with self.lock:
+            self.singles.append((base_url, post_id, new_title))
+        return post_id not in self.failing_ids, f"{base_url} {post_id} {new_title}"
+
+@patch('seo_auditor.wp_handler.WP_BATCH_SIZE', 2)
+@patch('seo_auditor.wp_handler._find_post', side_effect=find_post)
+class TestIterMetaUpdates(unittest.TestCase):
+    rows = [
+        ("https://a.com/p1/", "t1", "d1"),
+        ("https://b.com/p2/", "t2", "d2"),
+        ("https://a.com/missing", "t3", "d3"),
+        ("https://a.com/p4/", "t4", "d4"),
+        ("https://a.com/p5/", "t5", "d5"),
+        ("https://a.com/boom", "t6", "d6"),
+    ]
+
+    def run_updates(self, site):
+        with patch('seo_auditor.wp_handler.batch_update_meta', side_effect=site.batch), \
+                patch('seo_auditor.wp_handler._post_meta_update', side_effect=site.single):
+            results = list(iter_meta_updates(self.rows, "user", "pass", 4))
+        indexes = [i for i, _, _ in results]
+        # Every row is answered exactly once
+        self.assertEqual(sorted(indexes), list(range(len(self.rows))))
+        return {i: (success, msg) for i, success, msg in results}
+
+    def test_results_are_reported_against_their_own_row(self, _):
+        site = FakeSite()
+        results = self.run_updates(site)
+
+        for i in (0, 1, 3, 4):
+            url, title, _ = self.rows[i]
+            base_url = url.split("/p")[0]
+            self.assertEqual(results[i], (True, f"{base_url} {i + 1} {title}"))
+        self.assertEqual(results[2], (False, "ID not found for https://a.com/missing"))
+        self.assertEqual(results[5], (False, "lookup failed"))
+
+    def test_batches_are_grouped_by_site_and_sized(self, _):
+        site = FakeSite()
+        self.run_updates(site)
+
+        self.assertEqual(site.singles, [])
+        by_site = {}
+        for base_url, items in site.batches:
+            self.assertLessEqual(len(items), 2)
+            by_site.setdefault(base_url, []).extend(pid for _, pid, _, _ in items)
+        self.assertEqual({k: sorted(v) for k, v in by_site.items()}, {"https://a.com": [1, 4, 5], "https://b.com": [2]})
+
+    def test_sites_without_batch_endpoint_fall_back_to_single_updates(self, _):
+        site = FakeSite(batch_supported=False)
+        results = self.run_updates(site)
+
+        self.assertEqual(sorted(site.singles), [
+            ("https://a.com", 1, "t1"), ("https://a.com", 4, "t4"), ("https://a.com", 5, "t5"), ("https://b.com", 2, "t2"),
+        ])
+        self.assertEqual(results[3], (True, "https://a.com 4 t4"))
+
+    def test_failed_updates_forget_the_cached_id(self, _):
+        for batch_supported in (True, False):
+            site = FakeSite(batch_supported=batch_supported, failing_ids={4})
+            with patch('seo_auditor.wp_handler.forget_post') as mock_forget:
+                results = self.run_updates(site)
+            self.assertFalse(results[3][0])
+            mock_forget.assert_called_once_with("https://a.com/p4/")
+
+class TestFindPostCache(unittest.TestCase):
+    def setUp(self):
+        wp_handler.clear_wp_id_cache()
+        self.addCleanup(wp_handler.clear_wp_id_cache)
+
+    @patch('seo_auditor.wp_handler._search_post', return_value=("posts", 7))
+    def test_lookups_are_cached_until_forgotten_or_expired(self, mock_search):
+        wp_handler._find_post(None, "https://a.com/hello/")
+        self.assertEqual(wp_handler._find_post(None, "https://a.com/hello"), ("posts", 7))
+        self.assertEqual(mock_search.call_count, 1)
+
+        wp_handler.forget_post("https://a.com/hello")
+        wp_handler._find_post(None, "https://a.com/hello/")
+        self.assertEqual(mock_search.call_count, 2)
+
+        with patch.object(wp_handler, "WP_ID_CACHE_TTL", 0):
+            wp_handler._find_post(None, "https://a.com/hello/")
+        self.assertEqual(mock_search.call_count, 3)
+
+    @patch('seo_auditor.wp_handler._search_post', return_value=(None, None))
+    def test_misses_are_not_cached(self, mock_search):
+        wp_handler._find_post(None, "https://a.com/nope")
+        wp_handler._find_post(None, "https://a.com/nope")
+        self.assertEqual(mock_search.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()